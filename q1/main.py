@@ -12,7 +12,7 @@ from pathlib import Path
 # Add the src directory to the Python path
 sys.path.append(str(Path(__file__).parent / "src"))
 
-from cli import ModelComparisonCLI
+__version__ = "1.0.0"
 
 
 def main():
@@ -60,6 +60,12 @@ Examples:
         help="Show token usage and context window visualization"
     )
     
+    parser.add_argument(
+        "--verify-keys",
+        action="store_true",
+        help="Verify API keys with a live request to each provider"
+    )
+    
     parser.add_argument(
         "--config",
         type=str,
@@ -67,16 +73,30 @@ Examples:
         help="Path to configuration file (default: config.yaml)"
     )
     
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"%(prog)s {__version__}"
+    )
+    
     args = parser.parse_args()
     
+    if not args.interactive and not args.query:
+        parser.error("--query is required when not in interactive mode")
+    
+    # Imported only once the arguments are valid, so --help, --version and
+    # usage errors never load the provider SDKs
+    from cli import ModelComparisonCLI
+    
     # Initialize and run the CLI
-    cli = ModelComparisonCLI(config_path=args.config)
+    cli = ModelComparisonCLI(config_path=args.config, verify_keys=args.verify_keys)
     
     if args.interactive:
         cli.run_interactive()
     else:
-        if not args.query:
-            parser.error("--query is required when not in interactive mode")
+        # Interactive mode always shows the key status; single queries only on request
+        if args.verify_keys:
+            cli.check_api_keys()
         
         cli.run_single_query(
             query=args.query,
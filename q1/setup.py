@@ -6,9 +6,16 @@ This script helps users set up the environment and dependencies.
 
 import os
 import sys
+import shutil
 import subprocess
 from pathlib import Path
 
+# Generated with: pip-compile --generate-hashes -o requirements.lock requirements.txt
+LOCK_FILE = "requirements.lock"
+
+# Non-interactive pip without the network round trip for its version check
+PIP_INSTALL = [sys.executable, "-m", "pip", "install", "--no-input", "--disable-pip-version-check"]
+
 
 def check_python_version():
     """Check if Python version is compatible."""
@@ -25,8 +32,15 @@ def install_dependencies():
     """Install required dependencies."""
     print("\nInstalling dependencies...")
     
+    # Prefer the hash-pinned lock file when present: pins are reproducible and
+    # pip can satisfy warm re-installs straight from its wheel cache
+    if Path(LOCK_FILE).exists():
+        command = PIP_INSTALL + ["--require-hashes", "-r", LOCK_FILE]
+    else:
+        command = PIP_INSTALL + ["-r", "requirements.txt"]
+    
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        subprocess.check_call(command)
         print("✓ Dependencies installed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -49,8 +63,7 @@ def setup_environment():
     
     try:
         # Copy .env.example to .env
-        with open(env_example, 'r') as src, open(env_file, 'w') as dst:
-            dst.write(src.read())
+        shutil.copyfile(env_example, env_file)
         
         print("✓ Created .env file from template")
         print("📝 Please edit .env file and add your API keys")
@@ -79,15 +92,16 @@ def run_tests():
     print("\nRunning tests...")
     
     try:
-        result = subprocess.run([sys.executable, "test_tool.py"], capture_output=True, text=True)
+        # Stream test output as it is produced instead of buffering it
+        sys.stdout.flush()
+        process = subprocess.Popen([sys.executable, "-u", "test_tool.py"], stdout=sys.stdout, stderr=sys.stderr)
+        returncode = process.wait()
         
-        if result.returncode == 0:
+        if returncode == 0:
             print("✓ All tests passed")
             return True
         else:
-            print("❌ Some tests failed:")
-            print(result.stdout)
-            print(result.stderr)
+            print("❌ Some tests failed (see output above)")
             return False
             
     except Exception as e:
@@ -2,24 +2,32 @@
 
 import sys
 from typing import Dict, List, Optional
-from rich.console import Console
+from rich.console import Console, Group
 from rich.table import Table
 from rich.panel import Panel
-from rich.prompt import Prompt, Confirm
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.prompt import Prompt, IntPrompt, Confirm
+from rich.live import Live
+from rich.spinner import Spinner
 from rich.text import Text
 
 from config import Config
 from model_manager import ModelManager
 from visualization import Visualizer
 
+METADATA_TEMPLATE = (
+    "Response Time: {response_time:.2f}s\n"
+    "Tokens: {total_tokens} (prompt: {prompt_tokens}, completion: {completion_tokens})\n"
+    "Context Window: {context_window:,}"
+)
+
 
 class ModelComparisonCLI:
     """Command-line interface for model comparison."""
     
-    def __init__(self, config_path: str = "config.yaml"):
+    def __init__(self, config_path: str = "config.yaml", verify_keys: bool = False):
         """Initialize the CLI with configuration."""
         self.console = Console()
+        self.verify_keys = verify_keys  # Check keys against the provider APIs
         self.config = Config(config_path)
         self.model_manager = ModelManager(self.config)
         self.visualizer = Visualizer(self.config)
@@ -33,7 +41,7 @@ class ModelComparisonCLI:
         ))
         
         # Validate API keys
-        self._check_api_keys()
+        self.check_api_keys()
         
         while True:
             try:
@@ -74,33 +82,58 @@ class ModelComparisonCLI:
         self.console.print(f"[bold]Model Type:[/bold] {model_type}")
         self.console.print(f"[bold]Provider:[/bold] {provider}")
         
-        # Get responses from models
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console
-        ) as progress:
-            task = progress.add_task("Generating responses...", total=None)
+        # Get responses from models; all requests run concurrently. Streamed
+        # text is shown live, and each final panel is printed above the live
+        # area as soon as its model finishes
+        spinner = Spinner("dots", text="Generating responses...")
+        completed = []
+        streaming = {}  # (provider, model_name) -> text received so far
+        
+        def render():
+            panels = [
+                Panel(Text(text), title=f"{provider_name.title()} - {model_name}", border_style="dim")
+                for (provider_name, model_name), text in streaming.items()
+            ]
+            return Group(spinner, *panels)
+        
+        with Live(render(), console=self.console, transient=True, refresh_per_second=10) as live:
+            def show_text(provider_name, model_name, text):
+                key = (provider_name, model_name)
+                streaming[key] = streaming.get(key, "") + text
+                live.update(render())
+            
+            def show_response(response):
+                streaming.pop((response.provider, response.model_name), None)
+                completed.append(response)
+                spinner.update(text=f"Generating responses... ({len(completed)} received)")
+                # One print per response: the panel and its trailing blank line
+                live.console.print(Group(self._create_response_panel(response), Text()))
+                live.update(render())
             
             responses = self.model_manager.compare_models(
                 query=query,
                 model_type=model_type,
-                provider=provider
+                provider=provider,
+                on_response=show_response,
+                on_text=show_text
             )
-            
-            progress.update(task, completed=True)
         
-        # Display results
-        self._display_responses(responses)
+        if not responses:
+            self.console.print("[yellow]No responses generated.[/yellow]")
         
         # Show visualization if requested
         if visualize and responses:
             self.visualizer.create_comparison_visualization(responses)
     
-    def _check_api_keys(self):
+    def check_api_keys(self):
         """Check and display API key validation status."""
         validation_results = self.config.validate_api_keys()
         
+        # Key formats are checked locally; live requests only with --verify-keys
+        provider_results = self.model_manager.validate_providers(deep=self.verify_keys)
+        for provider, is_present in validation_results.items():
+            validation_results[provider] = is_present and provider_results.get(provider, False)
+        
         table = Table(title="API Key Status")
         table.add_column("Provider", style="cyan")
         table.add_column("Status", style="green")
@@ -127,16 +160,13 @@ class ModelComparisonCLI:
         for i, provider in enumerate(providers, 1):
             self.console.print(f"  {i}. {provider.title()}")
         
-        while True:
-            try:
-                choice = Prompt.ask(
-                    "Select provider",
-                    choices=[str(i) for i in range(1, len(providers) + 1)],
-                    default="1"
-                )
-                return providers[int(choice) - 1]
-            except (ValueError, IndexError):
-                self.console.print("[red]Invalid choice. Please try again.[/red]")
+        # IntPrompt re-asks until the answer is one of the choices
+        choice = IntPrompt.ask(
+            "Select provider",
+            choices=[str(i) for i in range(1, len(providers) + 1)],
+            default=1
+        )
+        return providers[choice - 1]
     
     def _select_model_type(self) -> str:
         """Interactive model type selection."""
@@ -152,47 +182,34 @@ class ModelComparisonCLI:
             }
             self.console.print(f"  {i}. {model_type.title()} - {description[model_type]}")
         
-        while True:
-            try:
-                choice = Prompt.ask(
-                    "Select model type",
-                    choices=[str(i) for i in range(1, len(model_types) + 1)],
-                    default="1"
-                )
-                return model_types[int(choice) - 1]
-            except (ValueError, IndexError):
-                self.console.print("[red]Invalid choice. Please try again.[/red]")
+        choice = IntPrompt.ask(
+            "Select model type",
+            choices=[str(i) for i in range(1, len(model_types) + 1)],
+            default=1
+        )
+        return model_types[choice - 1]
     
-    def _display_responses(self, responses: List):
-        """Display model responses in a formatted table."""
-        if not responses:
-            self.console.print("[yellow]No responses generated.[/yellow]")
-            return
+    def _create_response_panel(self, response) -> Panel:
+        """Create a panel showing a single model response."""
+        title = f"{response.provider.title()} - {response.model_name} ({response.model_type})"
         
-        for response in responses:
-            # Create a panel for each response
-            title = f"{response.provider.title()} - {response.model_name} ({response.model_type})"
-            
-            # Prepare metadata
-            metadata_text = (
-                f"Response Time: {response.response_time:.2f}s\n"
-                f"Tokens: {response.token_usage['total_tokens']} "
-                f"(prompt: {response.token_usage['prompt_tokens']}, "
-                f"completion: {response.token_usage['completion_tokens']})\n"
-                f"Context Window: {response.context_window:,}"
-            )
-            
-            # Create content with metadata
-            content = f"{response.content}\n\n[dim]{metadata_text}[/dim]"
-            
-            panel = Panel(
-                content,
-                title=title,
-                border_style="blue" if "error" not in response.metadata else "red"
-            )
-            
-            self.console.print(panel)
-            self.console.print()  # Add spacing
+        # Prepare metadata
+        metadata_text = METADATA_TEMPLATE.format_map({
+            'response_time': response.response_time,
+            'context_window': response.context_window,
+            **response.token_usage
+        })
+        
+        # Build styled content directly so Rich does not parse markup
+        content = Text(response.content)
+        content.append("\n\n")
+        content.append(metadata_text, style="dim")
+        
+        return Panel(
+            content,
+            title=title,
+            border_style="blue" if "error" not in response.metadata else "red"
+        )
     
     def list_available_models(self):
         """List all available models."""
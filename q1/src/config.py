@@ -1,10 +1,9 @@
 """Configuration management for the model comparison tool."""
 
 import os
-import yaml
+import orjson
 from pathlib import Path
 from typing import Dict, Any, Optional
-from dotenv import load_dotenv
 
 
 class Config:
@@ -13,15 +12,35 @@ class Config:
     def __init__(self, config_path: str = "config.yaml"):
         """Initialize configuration from file and environment variables."""
         self.config_path = Path(config_path)
+        self._cache_path = self.config_path.with_name(self.config_path.name + '.cache.json')
         self._config = {}
         self._load_config()
-        self._load_env_vars()
+        self._env_loaded = False  # .env is read on the first API key lookup
     
     def _load_config(self):
         """Load configuration from YAML file."""
         if self.config_path.exists():
+            # Reuse the parsed config from the JSON cache while the YAML file
+            # is unchanged (same mtime and size)
+            stat = self.config_path.stat()
+            cache_key = [stat.st_mtime_ns, stat.st_size]
+            cached = self._read_config_cache(cache_key)
+            if cached is not None:
+                self._config = cached
+                return
+            
+            import yaml
+            
+            # Prefer the libyaml-backed loader; same results, parsed in C
+            try:
+                from yaml import CSafeLoader as Loader
+            except ImportError:
+                from yaml import SafeLoader as Loader
+            
             with open(self.config_path, 'r') as f:
-                self._config = yaml.safe_load(f)
+                self._config = yaml.load(f, Loader=Loader)
+            
+            self._write_config_cache(cache_key)
         else:
             # Default configuration if file doesn't exist
             self._config = {
@@ -36,8 +55,36 @@ class Config:
                 }
             }
     
+    def _read_config_cache(self, cache_key: list) -> Optional[Dict[str, Any]]:
+        """Read the cached config if it was written for this cache key."""
+        try:
+            cache = orjson.loads(self._cache_path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        
+        if cache.get('_key') != cache_key:
+            return None
+        return cache.get('_data')
+    
+    def _write_config_cache(self, cache_key: list):
+        """Atomically write the parsed config to the JSON cache."""
+        try:
+            # Skip caching anything JSON can't represent exactly (e.g. dates)
+            data = orjson.dumps({'_key': cache_key, '_data': self._config})
+            if orjson.loads(data)['_data'] != self._config:
+                return
+            
+            tmp_path = self._cache_path.with_name(self._cache_path.name + '.tmp')
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, self._cache_path)
+        except (OSError, TypeError, ValueError):
+            # Caching is best-effort, e.g. the config directory may be read-only
+            pass
+    
     def _load_env_vars(self):
         """Load environment variables from .env file."""
+        from dotenv import load_dotenv
+        
         # Look for .env file in the same directory as config
         env_path = self.config_path.parent / '.env'
         if env_path.exists():
@@ -67,6 +114,10 @@ class Config:
             'huggingface': 'HUGGINGFACE_API_KEY'
         }
         
+        if not self._env_loaded:
+            self._load_env_vars()
+            self._env_loaded = True
+        
         env_var = env_var_map.get(provider.lower())
         if env_var:
             return os.getenv(env_var)
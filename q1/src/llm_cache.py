@@ -0,0 +1,69 @@
+"""Persistent cache of model responses for repeated queries."""
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+import orjson
+
+DEFAULT_CACHE_PATH = "~/.cache/mct/llm.db"
+DEFAULT_TTL_SECONDS = 86400
+
+
+def make_cache_key(
+    provider: str,
+    model_name: str,
+    model_type: str,
+    query: str,
+    temperature: float,
+    max_tokens: int
+) -> str:
+    """Hash the request fields that determine a model's response."""
+    payload = orjson.dumps({
+        'p': provider,
+        'm': model_name,
+        'mt': model_type,
+        'q': query,
+        't': temperature,
+        'max': max_tokens
+    }, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed response cache with a time-to-live."""
+    
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        """Initialize the cache (the database is opened on first use)."""
+        self.path = Path(path).expanduser()
+        self.ttl_seconds = ttl_seconds
+        self._conn = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the table if needed."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, resp BLOB, ts INTEGER)"
+            )
+        return self._conn
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached response, or None if missing or expired."""
+        row = self._connect().execute(
+            "SELECT resp, ts FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return orjson.loads(row[0])
+    
+    def set(self, key: str, resp: Dict[str, Any]):
+        """Store a response under a key."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, resp, ts) VALUES (?, ?, ?)",
+                (key, orjson.dumps(resp, default=str), int(time.time()))
+            )
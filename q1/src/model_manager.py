@@ -1,15 +1,41 @@
 """Model manager for coordinating multiple providers and models."""
 
 import asyncio
+import atexit
 import concurrent.futures
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import functools
+import importlib
+import random
+import time
+from typing import List, Dict, Any, Optional, Callable
+from dataclasses import dataclass, asdict
 
 from config import Config
 from providers.base import ModelResponse, ModelInfo
-from providers.openai_provider import OpenAIProvider
-from providers.anthropic_provider import AnthropicProvider
-from providers.huggingface_provider import HuggingFaceProvider
+from rate_limit import create_limiter
+from llm_cache import LLMCache, make_cache_key, DEFAULT_CACHE_PATH, DEFAULT_TTL_SECONDS
+
+# Provider name -> "module:Class"; each SDK is imported only if its key is set
+PROVIDER_CLASSES = {
+    'openai': 'providers.openai_provider:OpenAIProvider',
+    'anthropic': 'providers.anthropic_provider:AnthropicProvider',
+    'huggingface': 'providers.huggingface_provider:HuggingFaceProvider'
+}
+
+# Upper bound on simultaneous provider requests for a single comparison,
+# unless the config sets comparison.max_concurrent_requests
+MAX_CONCURRENT_REQUESTS = 16
+
+# Seconds a single provider request may take before it is abandoned
+REQUEST_TIMEOUT = 60
+
+# Seconds validate_providers waits for all providers' key checks together
+VALIDATION_TIMEOUT = 10
+
+# Attempts per request for rate-limited or transient failures, and the
+# base of the jittered exponential backoff between them (seconds)
+MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
 
 
 @dataclass
@@ -27,26 +53,73 @@ class ModelManager:
         """Initialize model manager with configuration."""
         self.config = config
         self.providers = {}
+        self._models_cache = {}  # Combined model lists keyed by provider filter
+        
+        # Responses for deterministic (temperature 0) or opted-in requests
+        self._response_cache = LLMCache(
+            self.config.get('cache.path', DEFAULT_CACHE_PATH),
+            self.config.get('cache.ttl_seconds', DEFAULT_TTL_SECONDS)
+        )
+        
+        # One event loop for the manager's lifetime, so the providers' async
+        # clients can keep their connections alive between comparisons
+        self._loop = asyncio.new_event_loop()
         self._initialize_providers()
+        self._loop.run_until_complete(self._prepare_providers())
+        atexit.register(self.close)
     
     def _initialize_providers(self):
         """Initialize all available providers."""
-        provider_classes = {
-            'openai': OpenAIProvider,
-            'anthropic': AnthropicProvider,
-            'huggingface': HuggingFaceProvider
-        }
+        # Blank or missing keys skip the provider before its SDK is imported
+        key_status = self.config.validate_api_keys()
         
-        for provider_name, provider_class in provider_classes.items():
-            api_key = self.config.get_api_key(provider_name)
-            if api_key:
-                try:
-                    self.providers[provider_name] = provider_class(
-                        api_key=api_key,
-                        config=self.config._config
-                    )
-                except Exception as e:
-                    print(f"Warning: Failed to initialize {provider_name} provider: {e}")
+        for provider_name, class_path in PROVIDER_CLASSES.items():
+            if not key_status.get(provider_name):
+                continue
+            
+            try:
+                module_name, class_name = class_path.split(':')
+                provider_class = getattr(importlib.import_module(module_name), class_name)
+                
+                provider_instance = provider_class(
+                    api_key=self.config.get_api_key(provider_name).strip(),
+                    config=self.config._config
+                )
+                
+                # Shape request rate to the provider's RPM/TPM budget
+                provider_instance.limiter = create_limiter(
+                    provider_name, self.config.get(f'rate_limits.{provider_name}')
+                )
+                self.providers[provider_name] = provider_instance
+            except ImportError as e:
+                print(f"Warning: {provider_name} API key is set but its client library is missing: {e}")
+            except Exception as e:
+                print(f"Warning: Failed to initialize {provider_name} provider: {e}")
+    
+    async def _prepare_providers(self):
+        """Run every provider's setup concurrently instead of one after another."""
+        names = list(self.providers)
+        results = await asyncio.gather(
+            *(self.providers[name].ainit() for name in names),
+            return_exceptions=True
+        )
+        
+        for provider_name, result in zip(names, results):
+            if isinstance(result, Exception):
+                print(f"Warning: Failed to prepare {provider_name} provider: {result}")
+    
+    def close(self):
+        """Close the providers' pooled connections and the event loop."""
+        if self._loop.is_closed():
+            return
+        
+        for provider_name, provider_instance in self.providers.items():
+            try:
+                self._loop.run_until_complete(provider_instance.aclose())
+            except Exception as e:
+                print(f"Warning: Failed to close {provider_name} provider: {e}")
+        
+        self._loop.close()
     
     def get_available_providers(self) -> List[str]:
         """Get list of available providers."""
@@ -54,6 +127,9 @@ class ModelManager:
     
     def get_available_models(self, provider: str = None) -> List[ModelInfo]:
         """Get available models from specified provider or all providers."""
+        if provider in self._models_cache:
+            return self._models_cache[provider]
+        
         models = []
         
         if provider and provider in self.providers:
@@ -62,6 +138,7 @@ class ModelManager:
             for provider_instance in self.providers.values():
                 models.extend(provider_instance.get_available_models())
         
+        self._models_cache[provider] = models
         return models
     
     def get_models_by_type(self, model_type: str, provider: str = None) -> List[ModelInfo]:
@@ -74,10 +151,19 @@ class ModelManager:
         query: str,
         model_type: str = "all",
         provider: str = "all",
-        max_concurrent: int = 3,
+        max_concurrent: Optional[int] = None,
+        on_response: Optional[Callable[[ModelResponse], None]] = None,
+        on_text: Optional[Callable[[str, str, str], None]] = None,
         **kwargs
     ) -> List[ModelResponse]:
-        """Compare models across providers and types."""
+        """Compare models across providers and types.
+        
+        If ``on_response`` is given it is called with each response as soon
+        as it arrives, so callers can render results while slower models are
+        still running. If ``on_text`` is given, providers that support
+        streaming call it as ``on_text(provider, model_name, text)`` for each
+        chunk of generated text.
+        """
         # Determine which models to use
         target_models = self._select_models_for_comparison(model_type, provider)
         
@@ -85,9 +171,9 @@ class ModelManager:
             return []
         
         # Generate responses concurrently
-        responses = self._generate_responses_concurrent(
-            query, target_models, max_concurrent, **kwargs
-        )
+        responses = self._loop.run_until_complete(self._generate_responses_async(
+            query, target_models, max_concurrent, on_response, on_text, **kwargs
+        ))
         
         return responses
     
@@ -118,47 +204,61 @@ class ModelManager:
             provider_instance = self.providers[provider_name]
             
             for mtype in target_types:
-                models = provider_instance.get_models_by_type(mtype)
-                for model in models:
-                    if model.available:
-                        selected_models.append((provider_name, model.name, model.model_type))
+                for model in provider_instance.get_models_by_type(mtype, available_only=True):
+                    selected_models.append((provider_name, model.name, model.model_type))
         
         return selected_models
     
-    def _generate_responses_concurrent(
+    def _max_concurrent_requests(self) -> int:
+        """Get the configured limit on simultaneous requests per comparison."""
+        return self.config.get('comparison.max_concurrent_requests', MAX_CONCURRENT_REQUESTS)
+    
+    async def _generate_responses_async(
         self,
         query: str,
         target_models: List[tuple],
-        max_concurrent: int,
+        max_concurrent: Optional[int],
+        on_response: Optional[Callable[[ModelResponse], None]] = None,
+        on_text: Optional[Callable[[str, str, str], None]] = None,
         **kwargs
     ) -> List[ModelResponse]:
         """Generate responses from multiple models concurrently."""
         responses = []
         
-        # Use ThreadPoolExecutor for concurrent API calls
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrent) as executor:
-            # Submit all tasks
-            future_to_model = {}
-            for provider_name, model_name, model_type in target_models:
-                future = executor.submit(
-                    self._generate_single_response,
-                    provider_name, model_name, model_type, query, **kwargs
+        # Provider calls are network-bound, so let every model run at once
+        # (capped) and total latency approach the slowest single call
+        if max_concurrent is None:
+            max_concurrent = min(self._max_concurrent_requests(), len(target_models))
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def generate(provider_name, model_name, model_type):
+            model_kwargs = dict(kwargs)
+            if on_text:
+                model_kwargs['on_text'] = functools.partial(on_text, provider_name, model_name)
+            
+            async with semaphore:
+                return await self._agenerate_single_response(
+                    provider_name, model_name, model_type, query, **model_kwargs
                 )
-                future_to_model[future] = (provider_name, model_name, model_type)
+        
+        # Collect results as they complete; like gather(return_exceptions=True),
+        # one failing model is reported and skipped rather than aborting the rest
+        tasks = [generate(*target) for target in target_models]
+        for future in asyncio.as_completed(tasks):
+            try:
+                response = await future
+            except Exception as e:
+                print(f"Error during comparison: {e}")
+                continue
             
-            # Collect results as they complete
-            for future in concurrent.futures.as_completed(future_to_model):
-                try:
-                    response = future.result(timeout=60)  # 60 second timeout
-                    if response:
-                        responses.append(response)
-                except Exception as e:
-                    provider_name, model_name, model_type = future_to_model[future]
-                    print(f"Error with {provider_name}/{model_name}: {e}")
+            if response:
+                responses.append(response)
+                if on_response:
+                    on_response(response)
         
         return responses
     
-    def _generate_single_response(
+    async def _agenerate_single_response(
         self,
         provider_name: str,
         model_name: str,
@@ -169,56 +269,181 @@ class ModelManager:
         """Generate a single response from a specific model."""
         try:
             provider = self.providers[provider_name]
-            response = provider.generate_response(
-                query=query,
-                model_name=model_name,
-                model_type=model_type,
-                **kwargs
-            )
+            
+            defaults = self.config.get_default_settings()
+            temperature = kwargs.get('temperature', defaults.get('temperature', 0.7))
+            max_tokens = kwargs.get('max_tokens', defaults.get('max_tokens', 1000))
+            
+            # Deterministic requests (or ones that opt in) are served from cache
+            start_time = time.time()
+            cache_key = None
+            if kwargs.pop('cache', False) or temperature == 0:
+                cache_key = make_cache_key(
+                    provider_name, model_name, model_type, query, temperature, max_tokens
+                )
+                cached = self._read_cached_response(cache_key, start_time)
+                if cached:
+                    return cached
+            
+            # Reserve the prompt plus the largest possible completion
+            est_tokens = provider._calculate_tokens(query, model_name) + max_tokens
+            
+            # Retries must fit in one REQUEST_TIMEOUT from the first attempt, so
+            # a long Retry-After can't stall the whole comparison
+            retry_deadline = time.monotonic() + REQUEST_TIMEOUT
+            for attempt in range(MAX_ATTEMPTS):
+                # The timeout covers the request itself, not time spent waiting
+                # for the rate limiter
+                async with provider.limiter.acquire(est_tokens):
+                    response = await asyncio.wait_for(
+                        provider.agenerate_response(
+                            query=query,
+                            model_name=model_name,
+                            model_type=model_type,
+                            **kwargs
+                        ),
+                        timeout=REQUEST_TIMEOUT
+                    )
+                
+                # Throttle the whole provider once for every 429 it returns
+                if response.metadata.get('rate_limited'):
+                    provider.limiter.on_429()
+                
+                if not response.metadata.get('retryable') or attempt + 1 == MAX_ATTEMPTS:
+                    break
+                
+                # Retry after the server's Retry-After or a jittered exponential backoff
+                delay = response.metadata.get('retry_after')
+                if delay is None:
+                    delay = RETRY_BASE_DELAY * 2 ** attempt * random.uniform(0.5, 1.5)
+                delay = min(delay, REQUEST_TIMEOUT)
+                if delay > retry_deadline - time.monotonic():
+                    break
+                await asyncio.sleep(delay)
+            
+            if 'error' not in response.metadata:
+                provider.limiter.on_success()
+                if cache_key:
+                    self._write_cached_response(cache_key, response)
             return response
+        except asyncio.TimeoutError:
+            print(f"Error with {provider_name}/{model_name}: timed out")
+            return None
         except Exception as e:
             print(f"Error generating response from {provider_name}/{model_name}: {e}")
             return None
     
+    def _read_cached_response(self, cache_key: str, start_time: float) -> Optional[ModelResponse]:
+        """Load a cached response, marked as a cache hit."""
+        try:
+            data = self._response_cache.get(cache_key)
+        except Exception as e:
+            print(f"Warning: Response cache unavailable: {e}")
+            return None
+        
+        if data is None:
+            return None
+        
+        response = ModelResponse(**data)
+        response.response_time = time.time() - start_time
+        response.metadata['cache_hit'] = True
+        return response
+    
+    def _write_cached_response(self, cache_key: str, response: ModelResponse):
+        """Store a successful response in the cache."""
+        try:
+            self._response_cache.set(cache_key, asdict(response))
+        except Exception as e:
+            print(f"Warning: Failed to cache response: {e}")
+    
     def create_comparison_summary(self, responses: List[ModelResponse]) -> Dict[str, Any]:
         """Create a summary of the comparison results."""
         if not responses:
             return {}
         
+        # Gather every statistic in one pass over the responses
+        fastest = slowest = most = least = responses[0]
+        total_time = 0.0
+        total_tokens = 0
+        model_types = set()
+        provider_stats = {}
+        
+        for r in responses:
+            tokens = r.token_usage["total_tokens"]
+            response_time = r.response_time
+            total_time += response_time
+            total_tokens += tokens
+            model_types.add(r.model_type)
+            
+            if response_time < fastest.response_time:
+                fastest = r
+            if response_time > slowest.response_time:
+                slowest = r
+            if tokens > most.token_usage["total_tokens"]:
+                most = r
+            if tokens < least.token_usage["total_tokens"]:
+                least = r
+            
+            stats = provider_stats.get(r.provider)
+            if stats is None:
+                stats = provider_stats[r.provider] = {"count": 0, "avg_response_time": 0.0, "total_tokens": 0}
+            stats["count"] += 1
+            stats["avg_response_time"] += response_time  # Summed here, averaged below
+            stats["total_tokens"] += tokens
+        
+        for stats in provider_stats.values():
+            stats["avg_response_time"] /= stats["count"]
+        
         summary = {
             "total_responses": len(responses),
-            "providers_used": list(set(r.provider for r in responses)),
-            "model_types_used": list(set(r.model_type for r in responses)),
-            "average_response_time": sum(r.response_time for r in responses) / len(responses),
-            "total_tokens_used": sum(r.token_usage["total_tokens"] for r in responses),
-            "fastest_response": min(responses, key=lambda r: r.response_time),
-            "slowest_response": max(responses, key=lambda r: r.response_time),
-            "most_tokens": max(responses, key=lambda r: r.token_usage["total_tokens"]),
-            "least_tokens": min(responses, key=lambda r: r.token_usage["total_tokens"])
+            "providers_used": list(provider_stats),
+            "model_types_used": list(model_types),
+            "average_response_time": total_time / len(responses),
+            "total_tokens_used": total_tokens,
+            "fastest_response": fastest,
+            "slowest_response": slowest,
+            "most_tokens": most,
+            "least_tokens": least
         }
         
-        # Add provider-specific statistics
-        provider_stats = {}
-        for provider in summary["providers_used"]:
-            provider_responses = [r for r in responses if r.provider == provider]
-            provider_stats[provider] = {
-                "count": len(provider_responses),
-                "avg_response_time": sum(r.response_time for r in provider_responses) / len(provider_responses),
-                "total_tokens": sum(r.token_usage["total_tokens"] for r in provider_responses)
-            }
-        
         summary["provider_stats"] = provider_stats
         
         return summary
     
-    def validate_providers(self) -> Dict[str, bool]:
-        """Validate all initialized providers."""
+    def validate_providers(self, deep: bool = False) -> Dict[str, bool]:
+        """Validate all initialized providers (live API calls only if deep)."""
         validation_results = {}
         
-        for provider_name, provider in self.providers.items():
-            try:
-                validation_results[provider_name] = provider.validate_api_key()
-            except Exception:
-                validation_results[provider_name] = False
+        if not self.providers:
+            return validation_results
+        
+        # Each validation is a network round trip, so run them side by side
+        # under one shared deadline
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(self.providers))
+        futures = {}
+        try:
+            futures = {
+                provider_name: executor.submit(provider.validate_api_key, deep)
+                for provider_name, provider in self.providers.items()
+            }
+            concurrent.futures.wait(futures.values(), timeout=VALIDATION_TIMEOUT)
+            
+            # Anything still running past the deadline counts as invalid
+            for provider_name, future in futures.items():
+                try:
+                    validation_results[provider_name] = future.done() and future.result()
+                except Exception:
+                    validation_results[provider_name] = False
+        finally:
+            # Don't wait for hung validations; the pool's threads finish on their own
+            for future in futures.values():
+                future.cancel()
+            executor.shutdown(wait=False)
+        
+        # A provider that fails validation rebuilds its model list next time
+        for provider_name, valid in validation_results.items():
+            if not valid:
+                self.providers[provider_name].invalidate_models()
+                self._models_cache.clear()
         
         return validation_results
@@ -1,9 +1,9 @@
 """Anthropic provider implementation."""
 
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable
 import anthropic
-from .base import BaseProvider, ModelResponse, ModelInfo
+from .base import BaseProvider, ModelResponse, ModelInfo, MODEL_TYPE_NAMES, TRANSIENT_ERROR_TYPES
 
 
 class AnthropicProvider(BaseProvider):
@@ -13,17 +13,22 @@ class AnthropicProvider(BaseProvider):
         """Initialize Anthropic provider."""
         super().__init__(api_key, config)
         self.client = anthropic.Anthropic(api_key=api_key)
+        
+        self._http = self._create_http_client()
+        self.async_client = anthropic.AsyncAnthropic(api_key=api_key, http_client=self._http, max_retries=0)
         self.provider_name = "anthropic"
+        # APITimeoutError is a subclass, so timeouts are covered too
+        self.transient_errors = TRANSIENT_ERROR_TYPES + (anthropic.APIConnectionError,)
+        self.key_prefix = "sk-ant-"
     
-    def get_available_models(self) -> List[ModelInfo]:
-        """Get list of available Anthropic models."""
+    def _fetch_models(self) -> List[ModelInfo]:
+        """Build list of available Anthropic models."""
         models = []
         
         # Define available models based on configuration
         model_configs = self.config.get('providers', {}).get('anthropic', {})
         
-        for model_type in ['base_models', 'instruct_models', 'fine_tuned_models']:
-            type_name = model_type.replace('_models', '').replace('_', '_')
+        for model_type, type_name in MODEL_TYPE_NAMES.items():
             model_list = model_configs.get(model_type, [])
             
             for model_config in model_list:
@@ -39,6 +44,89 @@ class AnthropicProvider(BaseProvider):
         
         return models
     
+    def _calculate_tokens(self, text: str, model_name: str = None) -> int:
+        """Count tokens with the SDK's Claude tokenizer when it provides one."""
+        # Older SDKs ship a local tokenizer; newer ones dropped it
+        count_tokens = getattr(self.client, 'count_tokens', None)
+        if count_tokens is not None:
+            try:
+                return count_tokens(text)
+            except Exception:
+                pass
+        
+        return super()._calculate_tokens(text, model_name)
+    
+    def _request_params(
+        self,
+        query: str,
+        model_name: str,
+        model_type: str,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Build request arguments for the completion or messages API."""
+        # Get default settings
+        defaults = self.config.get('defaults', {})
+        max_tokens = kwargs.get('max_tokens', defaults.get('max_tokens', 1000))
+        temperature = kwargs.get('temperature', defaults.get('temperature', 0.7))
+        
+        if model_type == 'base':
+            # For base models, use completion format
+            return {
+                'model': model_name,
+                'prompt': f"\n\nHuman: {query}\n\nAssistant:",
+                'max_tokens_to_sample': max_tokens,
+                'temperature': temperature
+            }
+        
+        # For instruct models, use messages API
+        return {
+            'model': model_name,
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+            'messages': [
+                {"role": "user", "content": query}
+            ]
+        }
+    
+    def _parse_api_response(
+        self,
+        response,
+        query: str,
+        model_name: str,
+        model_type: str,
+        start_time: float
+    ) -> ModelResponse:
+        """Convert a completion or messages API response into a ModelResponse."""
+        if model_type == 'base':
+            content = response.completion.strip()
+            
+            # Anthropic doesn't provide token usage in the same way
+            prompt_tokens = self._calculate_tokens(query, model_name)
+            completion_tokens = self._calculate_tokens(content, model_name)
+            
+        else:
+            content = response.content[0].text
+            
+            # Extract token usage if available
+            prompt_tokens = getattr(response.usage, 'input_tokens', None)
+            if prompt_tokens is None:
+                prompt_tokens = self._calculate_tokens(query, model_name)
+            completion_tokens = getattr(response.usage, 'output_tokens', None)
+            if completion_tokens is None:
+                completion_tokens = self._calculate_tokens(content, model_name)
+        
+        return self._create_response(
+            content=content,
+            model_name=model_name,
+            model_type=model_type,
+            start_time=start_time,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            prompt=query,
+            stop_reason=getattr(response, 'stop_reason', 'unknown'),
+            model_version=model_name
+        )
+    
     def generate_response(
         self,
         query: str,
@@ -48,76 +136,65 @@ class AnthropicProvider(BaseProvider):
     ) -> ModelResponse:
         """Generate response using Anthropic API."""
         start_time = time.time()
+        params = self._request_params(query, model_name, model_type, **kwargs)
         
-        # Get default settings
-        defaults = self.config.get('defaults', {})
-        max_tokens = kwargs.get('max_tokens', defaults.get('max_tokens', 1000))
-        temperature = kwargs.get('temperature', defaults.get('temperature', 0.7))
+        try:
+            if model_type == 'base':
+                response = self.client.completions.create(**params)
+            else:
+                response = self.client.messages.create(**params)
+            
+            return self._parse_api_response(response, query, model_name, model_type, start_time)
+            
+        except Exception as e:
+            return self._create_error_response(e, query, model_name, model_type, start_time)
+    
+    async def agenerate_response(
+        self,
+        query: str,
+        model_name: str,
+        model_type: str,
+        on_text: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ) -> ModelResponse:
+        """Generate response using the async Anthropic client."""
+        start_time = time.time()
+        params = self._request_params(query, model_name, model_type, **kwargs)
         
         try:
             if model_type == 'base':
-                # For base models, use completion format
-                response = self.client.completions.create(
-                    model=model_name,
-                    prompt=f"\n\nHuman: {query}\n\nAssistant:",
-                    max_tokens_to_sample=max_tokens,
-                    temperature=temperature
-                )
-                content = response.completion.strip()
-                
-                # Anthropic doesn't provide token usage in the same way
-                prompt_tokens = self._calculate_tokens(query)
-                completion_tokens = self._calculate_tokens(content)
-                
+                response = await self.async_client.completions.create(**params)
+            elif on_text is not None:
+                # Stream text deltas; the final message carries usage and stop reason
+                async with self.async_client.messages.stream(**params) as stream:
+                    async for text in stream.text_stream:
+                        on_text(text)
+                    response = await stream.get_final_message()
             else:
-                # For instruct models, use messages API
-                response = self.client.messages.create(
-                    model=model_name,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    messages=[
-                        {"role": "user", "content": query}
-                    ]
-                )
-                content = response.content[0].text
-                
-                # Extract token usage if available
-                prompt_tokens = getattr(response.usage, 'input_tokens', self._calculate_tokens(query))
-                completion_tokens = getattr(response.usage, 'output_tokens', self._calculate_tokens(content))
+                response = await self.async_client.messages.create(**params)
             
-            return self._create_response(
-                content=content,
-                model_name=model_name,
-                model_type=model_type,
-                start_time=start_time,
-                prompt_tokens=prompt_tokens,
-                completion_tokens=completion_tokens,
-                prompt=query,
-                stop_reason=getattr(response, 'stop_reason', 'unknown'),
-                model_version=model_name
-            )
+            return self._parse_api_response(response, query, model_name, model_type, start_time)
             
         except Exception as e:
-            # Return error response
-            return self._create_response(
-                content=f"Error: {str(e)}",
-                model_name=model_name,
-                model_type=model_type,
-                start_time=start_time,
-                prompt_tokens=0,
-                completion_tokens=0,
-                prompt=query,
-                error=str(e)
-            )
+            return self._create_error_response(e, query, model_name, model_type, start_time)
+    
+    async def aclose(self):
+        """Close the shared async HTTP client."""
+        await self._http.aclose()
     
-    def validate_api_key(self) -> bool:
+    def validate_api_key(self, deep: bool = False) -> bool:
         """Validate Anthropic API key."""
+        if not self._key_format_valid():
+            return False
+        if not deep:
+            return True
+        
         try:
-            # Try a simple completion as validation
-            self.client.completions.create(
+            # Try the smallest possible message as validation
+            self.client.messages.create(
                 model="claude-3-haiku-20240307",
-                prompt="\n\nHuman: Hello\n\nAssistant:",
-                max_tokens_to_sample=10
+                max_tokens=1,
+                messages=[{"role": "user", "content": "Hello"}]
             )
             return True
         except Exception:
@@ -1,14 +1,64 @@
 """Base provider interface for model comparison tool."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 from dataclasses import dataclass
+import asyncio
+import functools
 import time
 
 
+# Shortest plausible API key for any provider
+MIN_API_KEY_LENGTH = 20
+
+# Client-side HTTP errors that are transient and safe to retry
+RETRYABLE_STATUS_CODES = (408, 409, 429)
+
+# Timeouts and connection failures, which carry no status code but are just
+# as transient; providers add their SDK's equivalents to self.transient_errors
+TRANSIENT_ERROR_TYPES = (TimeoutError, ConnectionError, asyncio.TimeoutError)
+
+# Connection pool size for the providers' shared async HTTP clients
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 50
+
+# Config section name -> model type name
+MODEL_TYPE_NAMES = {
+    'base_models': 'base',
+    'instruct_models': 'instruct',
+    'fine_tuned_models': 'fine_tuned'
+}
+
+
+@functools.lru_cache(maxsize=8)
+def _get_encoder(model_name: str):
+    """Get a cached tiktoken encoding for a model (None if unavailable)."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        # Unknown to tiktoken (e.g. Claude models); cl100k is a close approximation
+        try:
+            return tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            return None
+    except Exception:
+        return None
+
+
+# Fields are listed in __slots__ by hand (dataclass(slots=True) needs
+# Python 3.10) so instances carry no per-object __dict__
 @dataclass
 class ModelResponse:
     """Standardized response from a model."""
+    __slots__ = (
+        'content', 'model_name', 'provider', 'model_type', 'token_usage',
+        'response_time', 'context_window', 'metadata'
+    )
     content: str
     model_name: str
     provider: str
@@ -19,9 +69,10 @@ class ModelResponse:
     metadata: Dict[str, Any]
 
 
-@dataclass
+@dataclass(frozen=True)
 class ModelInfo:
     """Information about a model."""
+    __slots__ = ('name', 'description', 'model_type', 'context_window', 'available', 'provider')
     name: str
     description: str
     model_type: str  # base, instruct, fine_tuned
@@ -38,12 +89,68 @@ class BaseProvider(ABC):
         self.api_key = api_key
         self.config = config or {}
         self.provider_name = self.__class__.__name__.lower().replace('provider', '')
+        self._cached_models = None  # Cache for get_available_models()
+        self._models_by_name = {}  # Model name -> ModelInfo for the cached list
+        self._models_by_type = {}  # Model type -> cached models of that type
+        self._available_models_by_type = {}  # Same, keeping only available models
+        self.key_prefix = ""  # Expected API key prefix, checked before any request
+        self.supports_prompt_list = False  # Accepts several prompts in one request
+        self.transient_errors = TRANSIENT_ERROR_TYPES  # Retryable exceptions without a status code
     
     @abstractmethod
-    def get_available_models(self) -> List[ModelInfo]:
-        """Get list of available models from this provider."""
+    def _fetch_models(self) -> List[ModelInfo]:
+        """Build the list of available models from this provider."""
         pass
     
+    async def ainit(self):
+        """Do any slow setup (such as fetching the model list) ahead of first use."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.get_available_models)
+    
+    def _create_http_client(self, **kwargs):
+        """Create the pooled async HTTP client shared by this provider's requests."""
+        import httpx
+        
+        # One pooled HTTP/2 client for every async request, so concurrent
+        # comparisons share connections instead of handshaking per call.
+        # Retries are handled by ModelManager together with the rate limiter,
+        # so SDK clients built on it should set max_retries=0
+        return httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            timeout=60.0,
+            **kwargs
+        )
+    
+    def get_available_models(self) -> List[ModelInfo]:
+        """Get list of available models from this provider (cached)."""
+        if self._cached_models is None:
+            self._cached_models = self._fetch_models()
+            self._index_models(self._cached_models)
+        return self._cached_models
+    
+    def _index_models(self, models: List[ModelInfo]):
+        """Build the by-name and by-type lookups for a model list."""
+        self._models_by_name = {}
+        self._models_by_type = {}
+        self._available_models_by_type = {}
+        
+        for model in models:
+            self._models_by_name[model.name] = model
+            self._models_by_type.setdefault(model.model_type, []).append(model)
+            if model.available:
+                self._available_models_by_type.setdefault(model.model_type, []).append(model)
+    
+    def invalidate_models(self):
+        """Drop the cached model list so the next lookup rebuilds it."""
+        self._cached_models = None
+        self._models_by_name = {}
+        self._models_by_type = {}
+        self._available_models_by_type = {}
+    
     @abstractmethod
     def generate_response(
         self,
@@ -55,31 +162,72 @@ class BaseProvider(ABC):
         """Generate response from the specified model."""
         pass
     
+    async def agenerate_response(
+        self,
+        query: str,
+        model_name: str,
+        model_type: str,
+        on_text: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ) -> ModelResponse:
+        """Generate response without blocking the event loop.
+        
+        Providers with an async client override this and, when ``on_text`` is
+        given, stream the completion through it chunk by chunk. The default
+        runs the blocking implementation in a worker thread and does not stream.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(self.generate_response, query, model_name, model_type, **kwargs)
+        )
+    
+    async def aclose(self):
+        """Close the provider's pooled HTTP connections."""
+        pass
+    
+    def accepts_prompt_list(self, model_type: str) -> bool:
+        """Check whether generate_response_multi can batch prompts for a model type."""
+        return self.supports_prompt_list
+    
     def get_model_info(self, model_name: str) -> Optional[ModelInfo]:
         """Get information about a specific model."""
-        models = self.get_available_models()
-        for model in models:
-            if model.name == model_name:
-                return model
-        return None
+        self.get_available_models()
+        return self._models_by_name.get(model_name)
+    
+    def get_models_by_type(self, model_type: str, available_only: bool = False) -> List[ModelInfo]:
+        """Get models filtered by type (and optionally by availability)."""
+        self.get_available_models()
+        by_type = self._available_models_by_type if available_only else self._models_by_type
+        return list(by_type.get(model_type, []))
     
-    def get_models_by_type(self, model_type: str) -> List[ModelInfo]:
-        """Get models filtered by type."""
-        models = self.get_available_models()
-        return [model for model in models if model.model_type == model_type]
+    def _key_format_valid(self) -> bool:
+        """Cheap local sanity check of the API key's shape."""
+        if not self.api_key or len(self.api_key.strip()) < MIN_API_KEY_LENGTH:
+            return False
+        return self.api_key.startswith(self.key_prefix)
     
-    def validate_api_key(self) -> bool:
-        """Validate that the API key is working."""
+    def validate_api_key(self, deep: bool = False) -> bool:
+        """Validate the API key locally, and with a live request if deep."""
+        if not self._key_format_valid():
+            return False
+        if not deep:
+            return True
+        
         try:
             # Try to get available models as a simple validation
-            self.get_available_models()
+            self._fetch_models()
             return True
         except Exception:
             return False
     
-    def _calculate_tokens(self, text: str) -> int:
-        """Estimate token count for text (rough approximation)."""
-        # Simple approximation: ~4 characters per token
+    def _calculate_tokens(self, text: str, model_name: str = None) -> int:
+        """Count tokens in text using a cached tokenizer for the model."""
+        encoder = _get_encoder(model_name or self.provider_name)
+        if encoder is not None:
+            return len(encoder.encode(text, disallowed_special=()))
+        
+        # Simple approximation when no tokenizer is available: ~4 characters per token
         return len(text) // 4
     
     def _create_response(
@@ -101,9 +249,9 @@ class BaseProvider(ABC):
         
         # Calculate token usage if not provided
         if prompt_tokens is None:
-            prompt_tokens = self._calculate_tokens(metadata.get('prompt', ''))
+            prompt_tokens = self._calculate_tokens(metadata.get('prompt', ''), model_name)
         if completion_tokens is None:
-            completion_tokens = self._calculate_tokens(content)
+            completion_tokens = self._calculate_tokens(content, model_name)
         
         token_usage = {
             'prompt_tokens': prompt_tokens,
@@ -121,3 +269,56 @@ class BaseProvider(ABC):
             context_window=context_window,
             metadata=metadata
         )
+    
+    def _create_error_response(
+        self,
+        error: Exception,
+        query: str,
+        model_name: str,
+        model_type: str,
+        start_time: float
+    ) -> ModelResponse:
+        """Create a ModelResponse describing a failed request."""
+        return self._create_response(
+            content=f"Error: {str(error)}",
+            model_name=model_name,
+            model_type=model_type,
+            start_time=start_time,
+            prompt_tokens=0,
+            completion_tokens=0,
+            prompt=query,
+            error=str(error),
+            rate_limited=self._is_rate_limit_error(error),
+            retryable=self._is_retryable_error(error),
+            retry_after=self._retry_after(error)
+        )
+    
+    def _error_status_code(self, error: Exception) -> Optional[int]:
+        """Get the HTTP status code of a failed request, if it has one."""
+        # SDK errors carry status_code; requests/httpx errors carry a response
+        status_code = getattr(error, 'status_code', None)
+        if status_code is None:
+            status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+        return status_code
+    
+    def _is_rate_limit_error(self, error: Exception) -> bool:
+        """Check whether an exception is an HTTP 429 from the provider."""
+        return self._error_status_code(error) == 429
+    
+    def _is_retryable_error(self, error: Exception) -> bool:
+        """Check whether a failed request is worth retrying (429, timeouts, 5xx)."""
+        status_code = self._error_status_code(error)
+        if status_code is None:
+            return isinstance(error, self.transient_errors)
+        return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+    
+    def _retry_after(self, error: Exception) -> Optional[float]:
+        """Get the server's Retry-After delay in seconds, if it sent one."""
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+        if not headers:
+            return None
+        
+        try:
+            return float(headers.get('retry-after'))
+        except (TypeError, ValueError):
+            return None
@@ -1,11 +1,96 @@
 """Hugging Face provider implementation."""
 
 import time
-from typing import List, Dict, Any
+import functools
+from typing import List, Dict, Any, Optional, Callable, Union
+import httpx
+import orjson
 import requests
-from transformers import AutoTokenizer, AutoModelForCausalLM
-import torch
-from .base import BaseProvider, ModelResponse, ModelInfo
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .base import BaseProvider, ModelResponse, ModelInfo, MODEL_TYPE_NAMES, TRANSIENT_ERROR_TYPES
+
+# Prompt length (in tokens) from which local generation uses a static KV cache
+STATIC_CACHE_MIN_PROMPT_TOKENS = 512
+
+# Compiled models generate in fixed-size token buckets to keep shapes stable
+COMPILED_TOKEN_BUCKET = 128
+
+
+# Supported values for the `providers.huggingface.quantization` config key
+QUANTIZATION_MODES = ("none", "int8", "nf4")
+
+
+def _compile_enabled(use_cuda: bool, quantization: str = "none") -> bool:
+    """Whether local models are wrapped with torch.compile."""
+    import torch
+    
+    return use_cuda and quantization == "none" and hasattr(torch, "compile")
+
+
+def _supports_static_cache(model) -> bool:
+    """Whether a loaded model can generate with a preallocated static KV cache."""
+    # Older architectures such as GPT-2 only support the default dynamic cache
+    return getattr(model, "_supports_static_cache", False)
+
+
+def _quantization_config(quantization: str):
+    """Build a bitsandbytes config, or None if unused or unavailable."""
+    if quantization == "none":
+        return None
+    
+    try:
+        import torch
+        import bitsandbytes  # noqa: F401
+        from transformers import BitsAndBytesConfig
+    except ImportError:
+        print(f"Warning: bitsandbytes not installed, ignoring quantization '{quantization}'")
+        return None
+    
+    if quantization == "int8":
+        return BitsAndBytesConfig(load_in_8bit=True)
+    return BitsAndBytesConfig(
+        load_in_4bit=True,
+        bnb_4bit_quant_type="nf4",
+        bnb_4bit_compute_dtype=torch.bfloat16,
+        bnb_4bit_use_double_quant=True
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _load_hf_model(model_name: str, use_cuda: bool, quantization: str = "none"):
+    """Load a tokenizer/model pair once per process and reuse it."""
+    # Imported here so API-only use never pays for torch/transformers
+    import torch
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+    
+    # Quantized weights need a CUDA device for the bitsandbytes kernels
+    quantization_config = _quantization_config(quantization) if use_cuda else None
+    if quantization_config is None:
+        quantization = "none"
+    
+    if use_cuda:
+        # Ampere and newer GPUs run bfloat16 at FP16 speed without overflow issues
+        major, _ = torch.cuda.get_device_capability()
+        torch_dtype = torch.bfloat16 if major >= 8 else torch.float16
+    else:
+        torch_dtype = torch.float32
+    
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForCausalLM.from_pretrained(
+        model_name,
+        torch_dtype=torch_dtype,
+        device_map="auto" if use_cuda else None,
+        low_cpu_mem_usage=True,
+        quantization_config=quantization_config
+    )
+    
+    # JIT-fuse the per-token forward pass; CUDA graphs remove dispatch overhead.
+    # The compiled graph needs fixed cache shapes, so only static-cache models qualify
+    if _compile_enabled(use_cuda, quantization) and _supports_static_cache(model):
+        model.forward = torch.compile(model.forward, mode="reduce-overhead", dynamic=False)
+    
+    return tokenizer, model
 
 
 class HuggingFaceProvider(BaseProvider):
@@ -15,19 +100,56 @@ class HuggingFaceProvider(BaseProvider):
         """Initialize Hugging Face provider."""
         super().__init__(api_key, config)
         self.provider_name = "huggingface"
+        self.supports_prompt_list = True
+        # Timeouts and connection failures from the sync and async HTTP clients
+        self.transient_errors = TRANSIENT_ERROR_TYPES + (
+            requests.exceptions.ConnectionError, requests.exceptions.Timeout, httpx.TransportError
+        )
         self.api_url = "https://api-inference.huggingface.co/models"
-        self.headers = {"Authorization": f"Bearer {api_key}"}
-        self._loaded_models = {}  # Cache for locally loaded models
+        # Request bodies are serialized with orjson and sent as raw bytes
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        # Local weight quantization (none, int8 or nf4)
+        hf_config = self.config.get('providers', {}).get('huggingface', {})
+        self.quantization = hf_config.get('quantization', 'none')
+        if self.quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unsupported quantization: {self.quantization}")
+        
+        # Shared session so repeated API calls reuse keep-alive connections
+        # instead of paying a new TCP + TLS handshake each time
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        self._session.headers["Accept-Encoding"] = "gzip"
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            # Every Inference API call is a POST, which urllib3 won't retry
+            # unless allowed; the final response is returned rather than raised
+            # so raise_for_status() reports it as an HTTPError as before
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.3,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False
+            )
+        )
+        self._session.mount("https://", adapter)
+        
+        # Async client for concurrent comparisons, sending the auth headers
+        self._async_client = self._create_http_client(headers=self.headers)
     
-    def get_available_models(self) -> List[ModelInfo]:
-        """Get list of available Hugging Face models."""
+    def _fetch_models(self) -> List[ModelInfo]:
+        """Build list of available Hugging Face models."""
         models = []
         
         # Define available models based on configuration
         model_configs = self.config.get('providers', {}).get('huggingface', {})
         
-        for model_type in ['base_models', 'instruct_models', 'fine_tuned_models']:
-            type_name = model_type.replace('_models', '').replace('_', '_')
+        for model_type, type_name in MODEL_TYPE_NAMES.items():
             model_list = model_configs.get(model_type, [])
             
             for model_config in model_list:
@@ -43,11 +165,9 @@ class HuggingFaceProvider(BaseProvider):
         
         return models
     
-    def _query_api(self, model_name: str, query: str, **kwargs) -> str:
-        """Query Hugging Face Inference API."""
-        url = f"{self.api_url}/{model_name}"
-        
-        payload = {
+    def _api_payload(self, query: Union[str, List[str]], **kwargs) -> Dict[str, Any]:
+        """Build the Inference API request body."""
+        return {
             "inputs": query,
             "parameters": {
                 "max_new_tokens": kwargs.get('max_tokens', 1000),
@@ -55,61 +175,148 @@ class HuggingFaceProvider(BaseProvider):
                 "return_full_text": False
             }
         }
-        
-        response = requests.post(url, headers=self.headers, json=payload)
-        response.raise_for_status()
-        
-        result = response.json()
+    
+    def _parse_api_result(self, result: Any) -> str:
+        """Extract generated text from an Inference API result."""
         if isinstance(result, list) and len(result) > 0:
             return result[0].get('generated_text', '')
         return str(result)
     
+    def _query_api(self, model_name: str, query: str, **kwargs) -> str:
+        """Query Hugging Face Inference API."""
+        url = f"{self.api_url}/{model_name}"
+        
+        response = self._session.post(url, data=orjson.dumps(self._api_payload(query, **kwargs)))
+        response.raise_for_status()
+        
+        return self._parse_api_result(orjson.loads(response.content))
+    
+    def _query_api_batch(self, model_name: str, queries: List[str], **kwargs) -> List[str]:
+        """Query Hugging Face Inference API with several prompts in one request."""
+        url = f"{self.api_url}/{model_name}"
+        
+        payload = self._api_payload(queries, **kwargs)
+        response = self._session.post(url, data=orjson.dumps(payload))
+        
+        # Some endpoints only accept a single input; fall back to one call each
+        if response.status_code == 400:
+            return [self._query_api(model_name, query, **kwargs) for query in queries]
+        response.raise_for_status()
+        
+        # Batched results come back as one entry (or list of entries) per input
+        results = orjson.loads(response.content)
+        return [
+            self._parse_api_result(result if isinstance(result, list) else [result])
+            for result in results
+        ]
+    
+    async def _aquery_api(self, model_name: str, query: str, **kwargs) -> str:
+        """Query Hugging Face Inference API with the async client."""
+        url = f"{self.api_url}/{model_name}"
+        
+        response = await self._async_client.post(url, content=orjson.dumps(self._api_payload(query, **kwargs)))
+        response.raise_for_status()
+        
+        return self._parse_api_result(orjson.loads(response.content))
+    
     def _load_model_locally(self, model_name: str):
-        """Load model locally using transformers."""
-        if model_name not in self._loaded_models:
-            try:
-                tokenizer = AutoTokenizer.from_pretrained(model_name)
-                model = AutoModelForCausalLM.from_pretrained(
-                    model_name,
-                    torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
-                    device_map="auto" if torch.cuda.is_available() else None
-                )
-                self._loaded_models[model_name] = {
-                    'tokenizer': tokenizer,
-                    'model': model
-                }
-            except Exception as e:
-                raise Exception(f"Failed to load model {model_name}: {str(e)}")
-        
-        return self._loaded_models[model_name]
+        """Load model locally using transformers (cached across the process)."""
+        try:
+            import torch
+            
+            tokenizer, model = _load_hf_model(
+                model_name, torch.cuda.is_available(), self.quantization
+            )
+        except Exception as e:
+            raise Exception(f"Failed to load model {model_name}: {str(e)}")
+        
+        return {
+            'tokenizer': tokenizer,
+            'model': model
+        }
     
     def _generate_locally(self, model_name: str, query: str, **kwargs) -> str:
         """Generate response using locally loaded model."""
+        import torch
+        
         model_components = self._load_model_locally(model_name)
         tokenizer = model_components['tokenizer']
         model = model_components['model']
         
-        # Tokenize input
-        inputs = tokenizer.encode(query, return_tensors="pt")
+        # Tokenize input directly onto the model's device
+        inputs = tokenizer(query, return_tensors="pt").to(model.device)
+        
+        max_new_tokens = kwargs.get('max_tokens', 1000)
+        compiled = (
+            _compile_enabled(model.device.type == "cuda", self.quantization)
+            and _supports_static_cache(model)
+        )
+        
+        gen_kwargs = {
+            'max_new_tokens': max_new_tokens,
+            'use_cache': True,
+            'pad_token_id': tokenizer.eos_token_id
+        }
+        
+        # Only sample when asked to; temperature <= 0 means greedy decoding
+        temperature = kwargs.get('temperature', 0.7)
+        if temperature > 0:
+            gen_kwargs.update(do_sample=True, temperature=temperature)
+        else:
+            gen_kwargs['do_sample'] = False
+        
+        # Long prompts get a contiguous, preallocated KV cache when the model
+        # supports one. Compiled models always use it and round the generation
+        # length up to a bucket so the cache shape (and therefore the compiled
+        # graph) is reused across calls
+        input_len = inputs.input_ids.shape[1]
+        if compiled:
+            gen_kwargs['cache_implementation'] = "static"
+            gen_kwargs['max_new_tokens'] = -(-max_new_tokens // COMPILED_TOKEN_BUCKET) * COMPILED_TOKEN_BUCKET
+        elif input_len >= STATIC_CACHE_MIN_PROMPT_TOKENS and _supports_static_cache(model):
+            gen_kwargs['cache_implementation'] = "static"
         
         # Generate response
-        with torch.no_grad():
-            outputs = model.generate(
-                inputs,
-                max_new_tokens=kwargs.get('max_tokens', 1000),
-                temperature=kwargs.get('temperature', 0.7),
-                do_sample=True,
-                pad_token_id=tokenizer.eos_token_id
-            )
+        with torch.inference_mode():
+            outputs = model.generate(**inputs, **gen_kwargs)
         
-        # Decode response
-        response = tokenizer.decode(outputs[0], skip_special_tokens=True)
+        # Decode only the completion: skip the prompt tokens and drop any
+        # tokens generated past the requested length
+        new_tokens = outputs[0, input_len:input_len + max_new_tokens]
+        response = tokenizer.decode(new_tokens, skip_special_tokens=True)
         
-        # Remove the input prompt from the response
-        if response.startswith(query):
-            response = response[len(query):].strip()
+        return response.strip()
+    
+    def _build_response(
+        self,
+        content: str,
+        query: str,
+        model_name: str,
+        model_type: str,
+        start_time: float,
+        use_local: bool
+    ) -> ModelResponse:
+        """Create a ModelResponse for generated content."""
+        # Calculate token usage, using the model's own tokenizer when it is loaded
+        if use_local:
+            tokenizer = self._load_model_locally(model_name)['tokenizer']
+            prompt_tokens = len(tokenizer.encode(query))
+            completion_tokens = len(tokenizer.encode(content, add_special_tokens=False))
+        else:
+            prompt_tokens = self._calculate_tokens(query, model_name)
+            completion_tokens = self._calculate_tokens(content, model_name)
         
-        return response
+        return self._create_response(
+            content=content,
+            model_name=model_name,
+            model_type=model_type,
+            start_time=start_time,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            prompt=query,
+            method="local" if use_local else "api",
+            model_version=model_name
+        )
     
     def generate_response(
         self,
@@ -128,45 +335,83 @@ class HuggingFaceProvider(BaseProvider):
             else:
                 content = self._query_api(model_name, query, **kwargs)
             
-            # Calculate token usage
-            prompt_tokens = self._calculate_tokens(query)
-            completion_tokens = self._calculate_tokens(content)
+            return self._build_response(content, query, model_name, model_type, start_time, use_local)
             
-            return self._create_response(
-                content=content,
-                model_name=model_name,
-                model_type=model_type,
-                start_time=start_time,
-                prompt_tokens=prompt_tokens,
-                completion_tokens=completion_tokens,
-                prompt=query,
-                method="local" if use_local else "api",
-                model_version=model_name
-            )
+        except Exception as e:
+            return self._create_error_response(e, query, model_name, model_type, start_time)
+    
+    def generate_response_multi(
+        self,
+        queries: List[str],
+        model_name: str,
+        model_type: str,
+        use_local: bool = False,
+        **kwargs
+    ) -> List[ModelResponse]:
+        """Generate responses for several prompts with one Inference API call."""
+        # Local models answer one prompt at a time, just like generate_response
+        if use_local:
+            return [
+                self.generate_response(query, model_name, model_type, use_local=True, **kwargs)
+                for query in queries
+            ]
+        
+        start_time = time.time()
+        
+        try:
+            contents = self._query_api_batch(model_name, queries, **kwargs)
+            return [
+                self._build_response(content, query, model_name, model_type, start_time, False)
+                for query, content in zip(queries, contents)
+            ]
             
         except Exception as e:
-            # Return error response
-            return self._create_response(
-                content=f"Error: {str(e)}",
-                model_name=model_name,
-                model_type=model_type,
-                start_time=start_time,
-                prompt_tokens=0,
-                completion_tokens=0,
-                prompt=query,
-                error=str(e)
+            return [
+                self._create_error_response(e, query, model_name, model_type, start_time)
+                for query in queries
+            ]
+    
+    async def agenerate_response(
+        self,
+        query: str,
+        model_name: str,
+        model_type: str,
+        use_local: bool = False,
+        on_text: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ) -> ModelResponse:
+        """Generate response without blocking the event loop (not streamed)."""
+        # Local generation is compute-bound, so it keeps the threaded default
+        if use_local:
+            return await super().agenerate_response(
+                query, model_name, model_type, use_local=True, **kwargs
             )
+        
+        start_time = time.time()
+        
+        try:
+            content = await self._aquery_api(model_name, query, **kwargs)
+            return self._build_response(content, query, model_name, model_type, start_time, False)
+            
+        except Exception as e:
+            return self._create_error_response(e, query, model_name, model_type, start_time)
+    
+    async def aclose(self):
+        """Close the async client and the keep-alive session."""
+        await self._async_client.aclose()
+        self._session.close()
     
-    def validate_api_key(self) -> bool:
+    def validate_api_key(self, deep: bool = False) -> bool:
         """Validate Hugging Face API key."""
+        if not self._key_format_valid():
+            return False
+        if not deep:
+            return True
+        
         try:
             # Try to query a simple model
             test_url = f"{self.api_url}/gpt2"
-            response = requests.post(
-                test_url,
-                headers=self.headers,
-                json={"inputs": "Hello"}
-            )
+            response = self._session.post(test_url, data=orjson.dumps({"inputs": "Hello"}))
             return response.status_code == 200
         except Exception:
             return False
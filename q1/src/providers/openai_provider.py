@@ -1,9 +1,9 @@
 """OpenAI provider implementation."""
 
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable
 import openai
-from .base import BaseProvider, ModelResponse, ModelInfo
+from .base import BaseProvider, ModelResponse, ModelInfo, MODEL_TYPE_NAMES, TRANSIENT_ERROR_TYPES
 
 
 class OpenAIProvider(BaseProvider):
@@ -13,17 +13,23 @@ class OpenAIProvider(BaseProvider):
         """Initialize OpenAI provider."""
         super().__init__(api_key, config)
         self.client = openai.OpenAI(api_key=api_key)
+        
+        self._http = self._create_http_client()
+        self.async_client = openai.AsyncOpenAI(api_key=api_key, http_client=self._http, max_retries=0)
         self.provider_name = "openai"
+        # APITimeoutError is a subclass, so timeouts are covered too
+        self.transient_errors = TRANSIENT_ERROR_TYPES + (openai.APIConnectionError,)
+        self.key_prefix = "sk-"
+        self.supports_prompt_list = True
     
-    def get_available_models(self) -> List[ModelInfo]:
-        """Get list of available OpenAI models."""
+    def _fetch_models(self) -> List[ModelInfo]:
+        """Build list of available OpenAI models."""
         models = []
         
         # Define available models based on configuration
         model_configs = self.config.get('providers', {}).get('openai', {})
         
-        for model_type in ['base_models', 'instruct_models', 'fine_tuned_models']:
-            type_name = model_type.replace('_models', '').replace('_', '_')
+        for model_type, type_name in MODEL_TYPE_NAMES.items():
             model_list = model_configs.get(model_type, [])
             
             for model_config in model_list:
@@ -39,6 +45,55 @@ class OpenAIProvider(BaseProvider):
         
         return models
     
+    def _request_params(
+        self,
+        query: str,
+        model_name: str,
+        model_type: str,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Build request arguments for the completion or chat API."""
+        # Get default settings
+        defaults = self.config.get('defaults', {})
+        params = {
+            'model': model_name,
+            'max_tokens': kwargs.get('max_tokens', defaults.get('max_tokens', 1000)),
+            'temperature': kwargs.get('temperature', defaults.get('temperature', 0.7))
+        }
+        
+        if model_type == 'base':
+            params['prompt'] = query
+        else:
+            params['messages'] = [{"role": "user", "content": query}]
+        
+        return params
+    
+    def _parse_api_response(
+        self,
+        response,
+        query: str,
+        model_name: str,
+        model_type: str,
+        start_time: float
+    ) -> ModelResponse:
+        """Convert a completion or chat API response into a ModelResponse."""
+        if model_type == 'base':
+            content = response.choices[0].text.strip()
+        else:
+            content = response.choices[0].message.content
+        
+        return self._create_response(
+            content=content,
+            model_name=model_name,
+            model_type=model_type,
+            start_time=start_time,
+            prompt_tokens=response.usage.prompt_tokens,
+            completion_tokens=response.usage.completion_tokens,
+            prompt=query,
+            finish_reason=response.choices[0].finish_reason,
+            model_version=response.model
+        )
+    
     def generate_response(
         self,
         query: str,
@@ -48,66 +103,162 @@ class OpenAIProvider(BaseProvider):
     ) -> ModelResponse:
         """Generate response using OpenAI API."""
         start_time = time.time()
-        
-        # Get default settings
-        defaults = self.config.get('defaults', {})
-        max_tokens = kwargs.get('max_tokens', defaults.get('max_tokens', 1000))
-        temperature = kwargs.get('temperature', defaults.get('temperature', 0.7))
+        params = self._request_params(query, model_name, model_type, **kwargs)
         
         try:
             if model_type == 'base':
                 # For base models, use completion API (if available)
-                response = self.client.completions.create(
-                    model=model_name,
-                    prompt=query,
-                    max_tokens=max_tokens,
-                    temperature=temperature
-                )
-                content = response.choices[0].text.strip()
-                prompt_tokens = response.usage.prompt_tokens
-                completion_tokens = response.usage.completion_tokens
-                
+                response = self.client.completions.create(**params)
             else:
                 # For instruct and fine-tuned models, use chat API
-                messages = [{"role": "user", "content": query}]
-                
-                response = self.client.chat.completions.create(
-                    model=model_name,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    temperature=temperature
+                response = self.client.chat.completions.create(**params)
+            
+            return self._parse_api_response(response, query, model_name, model_type, start_time)
+            
+        except Exception as e:
+            return self._create_error_response(e, query, model_name, model_type, start_time)
+    
+    def accepts_prompt_list(self, model_type: str) -> bool:
+        """Only the completions API (base models) takes a list of prompts."""
+        return self.supports_prompt_list and model_type == 'base'
+    
+    def generate_response_multi(
+        self,
+        queries: List[str],
+        model_name: str,
+        model_type: str,
+        **kwargs
+    ) -> List[ModelResponse]:
+        """Generate responses for several prompts with one completions request."""
+        start_time = time.time()
+        params = self._request_params(queries[0], model_name, model_type, **kwargs)
+        params['prompt'] = queries
+        
+        try:
+            response = self.client.completions.create(**params)
+            
+            # Choices come back tagged with the index of their prompt
+            texts = [""] * len(queries)
+            finish_reasons = [None] * len(queries)
+            for choice in response.choices:
+                texts[choice.index] = choice.text.strip()
+                finish_reasons[choice.index] = choice.finish_reason
+            
+            # Usage covers the whole request, so token counts are left to
+            # _create_response to compute per prompt
+            return [
+                self._create_response(
+                    content=content,
+                    model_name=model_name,
+                    model_type=model_type,
+                    start_time=start_time,
+                    prompt=query,
+                    finish_reason=finish_reason,
+                    model_version=response.model,
+                    batch_size=len(queries)
+                )
+                for query, content, finish_reason in zip(queries, texts, finish_reasons)
+            ]
+            
+        except Exception as e:
+            return [
+                self._create_error_response(e, query, model_name, model_type, start_time)
+                for query in queries
+            ]
+    
+    async def agenerate_response(
+        self,
+        query: str,
+        model_name: str,
+        model_type: str,
+        on_text: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ) -> ModelResponse:
+        """Generate response using the async OpenAI client."""
+        start_time = time.time()
+        params = self._request_params(query, model_name, model_type, **kwargs)
+        
+        try:
+            if on_text is not None:
+                return await self._astream_response(
+                    params, on_text, query, model_name, model_type, start_time
                 )
-                content = response.choices[0].message.content
-                prompt_tokens = response.usage.prompt_tokens
-                completion_tokens = response.usage.completion_tokens
             
-            return self._create_response(
-                content=content,
-                model_name=model_name,
-                model_type=model_type,
-                start_time=start_time,
-                prompt_tokens=prompt_tokens,
-                completion_tokens=completion_tokens,
-                prompt=query,
-                finish_reason=response.choices[0].finish_reason,
-                model_version=response.model
-            )
+            if model_type == 'base':
+                response = await self.async_client.completions.create(**params)
+            else:
+                response = await self.async_client.chat.completions.create(**params)
+            
+            return self._parse_api_response(response, query, model_name, model_type, start_time)
             
         except Exception as e:
-            # Return error response
-            return self._create_response(
-                content=f"Error: {str(e)}",
-                model_name=model_name,
-                model_type=model_type,
-                start_time=start_time,
-                prompt_tokens=0,
-                completion_tokens=0,
-                prompt=query,
-                error=str(e)
-            )
+            return self._create_error_response(e, query, model_name, model_type, start_time)
     
-    def validate_api_key(self) -> bool:
+    async def _astream_response(
+        self,
+        params: Dict[str, Any],
+        on_text: Callable[[str], None],
+        query: str,
+        model_name: str,
+        model_type: str,
+        start_time: float
+    ) -> ModelResponse:
+        """Stream a completion, passing each text delta to on_text."""
+        if model_type == 'base':
+            create = self.async_client.completions.create
+        else:
+            create = self.async_client.chat.completions.create
+        
+        # Usage arrives in a final chunk with no choices
+        stream = await create(**params, stream=True, stream_options={"include_usage": True})
+        
+        parts = []
+        usage = None
+        finish_reason = None
+        model_version = model_name
+        
+        async for chunk in stream:
+            model_version = chunk.model or model_version
+            if chunk.usage:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            
+            choice = chunk.choices[0]
+            text = choice.text if model_type == 'base' else choice.delta.content
+            if text:
+                parts.append(text)
+                on_text(text)
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+        
+        content = "".join(parts)
+        if model_type == 'base':
+            content = content.strip()
+        
+        return self._create_response(
+            content=content,
+            model_name=model_name,
+            model_type=model_type,
+            start_time=start_time,
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None,
+            prompt=query,
+            finish_reason=finish_reason,
+            model_version=model_version
+        )
+    
+    async def aclose(self):
+        """Close the shared async HTTP client."""
+        await self._http.aclose()
+    
+    def validate_api_key(self, deep: bool = False) -> bool:
         """Validate OpenAI API key."""
+        if not self._key_format_valid():
+            return False
+        if not deep:
+            return True
+        
         try:
             # Try to list models as a simple validation
             self.client.models.list()
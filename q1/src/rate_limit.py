@@ -0,0 +1,101 @@
+"""Per-provider rate limiting for concurrent model requests."""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+# Default budgets per provider: requests/min, tokens/min and concurrent requests
+PROVIDER_LIMITS = {
+    'openai': {'rpm': 60, 'tpm': 150_000, 'max_concurrent': 10},
+    'anthropic': {'rpm': 50, 'tpm': 80_000, 'max_concurrent': 5},
+    'huggingface': {'rpm': 60, 'tpm': 100_000, 'max_concurrent': 5}
+}
+DEFAULT_LIMITS = {'rpm': 60, 'tpm': 100_000, 'max_concurrent': 5}
+
+# Length of the sliding RPM/TPM window, in seconds
+WINDOW_SECONDS = 60.0
+
+# How often a waiting request re-checks a full concurrency slot, in seconds
+POLL_INTERVAL = 0.05
+
+# Consecutive successes needed before the concurrency ceiling grows by one
+SUCCESSES_PER_INCREASE = 5
+
+
+class ProviderLimiter:
+    """Sliding-window RPM/TPM limiter with AIMD concurrency for one provider.
+    
+    Concurrency is halved on every rate-limit (429) response and grows back by
+    one after a run of successes, up to the provider's configured maximum.
+    """
+    
+    def __init__(self, rpm: int, tpm: int, max_concurrent: int):
+        """Initialize the limiter with the provider's budgets."""
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrent = max_concurrent
+        self.concurrency_limit = max_concurrent  # Ceiling for additive increase
+        
+        self._in_flight = 0
+        self._successes = 0
+        self._window = deque()  # (timestamp, tokens) of recent requests
+        self._window_tokens = 0
+    
+    def _expire(self, now: float):
+        """Drop requests that have left the sliding window."""
+        while self._window and now - self._window[0][0] >= WINDOW_SECONDS:
+            _, tokens = self._window.popleft()
+            self._window_tokens -= tokens
+    
+    def _delay(self, tokens: int) -> float:
+        """Seconds to wait before a request of ``tokens`` may start (0 if now)."""
+        now = time.monotonic()
+        self._expire(now)
+        
+        if self._in_flight >= self.max_concurrent:
+            return POLL_INTERVAL
+        
+        # A single oversized request is let through once the window is empty
+        over_tpm = self._window and self._window_tokens + tokens > self.tpm
+        if len(self._window) >= self.rpm or over_tpm:
+            return WINDOW_SECONDS - (now - self._window[0][0])
+        
+        return 0.0
+    
+    @asynccontextmanager
+    async def acquire(self, est_tokens: int = 0):
+        """Wait for capacity, then hold one request slot for the block."""
+        delay = self._delay(est_tokens)
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self._delay(est_tokens)
+        
+        self._in_flight += 1
+        self._window.append((time.monotonic(), est_tokens))
+        self._window_tokens += est_tokens
+        
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+    
+    def on_429(self):
+        """Multiplicatively back off after a rate-limit response."""
+        self.max_concurrent = max(1, self.max_concurrent // 2)
+        self._successes = 0
+    
+    def on_success(self):
+        """Additively raise concurrency after enough consecutive successes."""
+        self._successes += 1
+        if self._successes >= SUCCESSES_PER_INCREASE:
+            self._successes = 0
+            self.max_concurrent = min(self.concurrency_limit, self.max_concurrent + 1)
+
+
+def create_limiter(provider_name: str, overrides: Dict[str, Any] = None) -> ProviderLimiter:
+    """Create a limiter seeded from the provider's default budgets."""
+    limits = dict(PROVIDER_LIMITS.get(provider_name, DEFAULT_LIMITS))
+    limits.update(overrides or {})
+    return ProviderLimiter(**limits)
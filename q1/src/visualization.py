@@ -1,5 +1,10 @@
 """Visualization module for model comparison results."""
 
+import io
+import os
+import sys
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
@@ -12,6 +17,66 @@ from rich.table import Table
 from providers.base import ModelResponse
 from config import Config
 
+# Global matplotlib/seaborn style only needs to be applied once per process
+_style_initialized = False
+
+# Matplotlib backends that render to files only; plt.show() does nothing
+NON_INTERACTIVE_BACKENDS = ('agg', 'cairo', 'pdf', 'pgf', 'ps', 'svg', 'template')
+
+
+def _has_display() -> bool:
+    """Whether plt.show() can actually put a figure in front of the user."""
+    backend = plt.get_backend().lower()
+    if backend in NON_INTERACTIVE_BACKENDS:
+        return False
+    if 'inline' in backend:
+        return True
+    
+    # X11/Wayland backends need a display server on Linux
+    if sys.platform.startswith('linux'):
+        return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+    return True
+
+
+# Worker processes that encode saved figures to PNG off the main thread
+_savefig_pool = None
+
+
+def _get_savefig_pool() -> ProcessPoolExecutor:
+    """Get the shared savefig process pool, creating it on first use."""
+    global _savefig_pool
+    if _savefig_pool is None:
+        _savefig_pool = ProcessPoolExecutor(max_workers=2)
+    return _savefig_pool
+
+
+def _write_png(fig, path: str, dpi: int):
+    """Render a figure to PNG in memory and write the file in one call."""
+    try:
+        import imageio.v3 as iio
+    except ImportError:
+        iio = None
+    
+    if iio is not None:
+        # Draw the canvas once and hand the raw RGBA pixels to imageio's
+        # encoder, bypassing matplotlib's PNG writer
+        fig.set_dpi(dpi)
+        fig.canvas.draw()
+        rgba = np.asarray(fig.canvas.buffer_rgba())
+        Path(path).write_bytes(iio.imwrite("<bytes>", rgba, extension=".png"))
+        return
+    
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi)
+    Path(path).write_bytes(buffer.getvalue())
+
+
+def _save_pickled_figure(blob: bytes, path: str, dpi: int):
+    """Unpickle a figure and save it (runs in a worker process)."""
+    fig = pickle.loads(blob)
+    _write_png(fig, path, dpi)
+    plt.close(fig)
+
 
 class Visualizer:
     """Handles visualization of model comparison results."""
@@ -20,10 +85,14 @@ class Visualizer:
         """Initialize visualizer with configuration."""
         self.config = config
         self.console = Console()
+        self._pending_saves = []  # Futures for figures still being written
         
         # Set up matplotlib style
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
+        global _style_initialized
+        if not _style_initialized:
+            plt.style.use('seaborn-v0_8')
+            sns.set_palette("husl")
+            _style_initialized = True
         
         # Create output directory if needed
         if self.config.should_save_plots():
@@ -36,150 +105,186 @@ class Visualizer:
             self.console.print("[yellow]No responses to visualize.[/yellow]")
             return
         
+        # Charts would be neither saved nor shown, so only print the table
+        if not self.config.should_save_plots() and not _has_display():
+            self._create_summary_table(responses)
+            return
+        
         # Create DataFrame for easier manipulation
         df = self._responses_to_dataframe(responses)
         
         # Create visualizations
-        self._create_response_time_chart(df)
-        self._create_token_usage_chart(df)
-        self._create_context_window_chart(df)
+        self._build_all_charts(df)
         self._create_summary_table(responses)
         
         if self.config.should_save_plots():
+            self._wait_for_saves()
             self.console.print(f"[green]Plots saved to {self.config.get_plot_output_dir()}[/green]")
         else:
             plt.show()
     
-    def _responses_to_dataframe(self, responses: List[ModelResponse]) -> pd.DataFrame:
-        """Convert responses to pandas DataFrame."""
-        data = []
+    def _build_all_charts(self, df: pd.DataFrame):
+        """Draw every comparison chart onto one figure with precreated axes."""
+        fig, axes = plt.subplots(nrows=4, ncols=2, figsize=(15, 24))
         
-        for response in responses:
-            data.append({
-                'provider': response.provider,
-                'model_name': response.model_name,
-                'model_type': response.model_type,
-                'response_time': response.response_time,
-                'prompt_tokens': response.token_usage['prompt_tokens'],
-                'completion_tokens': response.token_usage['completion_tokens'],
-                'total_tokens': response.token_usage['total_tokens'],
-                'context_window': response.context_window,
-                'content_length': len(response.content),
-                'has_error': 'error' in response.metadata
-            })
-        
-        return pd.DataFrame(data)
-    
-    def _create_response_time_chart(self, df: pd.DataFrame):
-        """Create response time comparison chart."""
-        plt.figure(figsize=(12, 6))
+        self._create_response_time_chart(df, axes[0])
+        self._create_token_usage_chart(df, axes[1:3].ravel())
+        self._create_context_window_chart(df, axes[3])
         
-        # Create subplot for response times
-        plt.subplot(1, 2, 1)
-        sns.barplot(data=df, x='provider', y='response_time', hue='model_type')
-        plt.title('Response Time by Provider and Model Type')
-        plt.ylabel('Response Time (seconds)')
-        plt.xticks(rotation=45)
-        plt.legend(title='Model Type')
-        
-        # Create subplot for response time distribution
-        plt.subplot(1, 2, 2)
-        sns.boxplot(data=df, x='provider', y='response_time')
-        plt.title('Response Time Distribution by Provider')
-        plt.ylabel('Response Time (seconds)')
-        plt.xticks(rotation=45)
-        
-        plt.tight_layout()
+        fig.tight_layout()
         
         if self.config.should_save_plots():
-            plt.savefig(f"{self.config.get_plot_output_dir()}/response_times.png", dpi=300, bbox_inches='tight')
-            plt.close()
+            self._save_figure(fig, "comparison.png")
+    
+    def _save_figure(self, fig, filename: str, dpi: int = 300):
+        """Save a figure, encoding it in a worker process unless disabled."""
+        path = f"{self.config.get_plot_output_dir()}/{filename}"
+        
+        if os.getenv('PLOT_SAVE_SINGLECORE', 'false').lower() != 'true':
+            try:
+                blob = pickle.dumps(fig)
+                self._pending_saves.append(
+                    _get_savefig_pool().submit(_save_pickled_figure, blob, path, dpi)
+                )
+                plt.close(fig)
+                return
+            except Exception as e:
+                print(f"Warning: Background save unavailable, saving in-process: {e}")
+        
+        _write_png(fig, path, dpi)
+        plt.close(fig)
     
-    def _create_token_usage_chart(self, df: pd.DataFrame):
+    def _wait_for_saves(self):
+        """Block until all background figure saves have finished."""
+        for future in self._pending_saves:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Warning: Failed to save plot: {e}")
+        
+        self._pending_saves = []
+    
+    def _responses_to_dataframe(self, responses: List[ModelResponse]) -> pd.DataFrame:
+        """Convert responses to pandas DataFrame."""
+        n = len(responses)
+        
+        # Fill typed columns directly instead of building one dict per row
+        providers = np.empty(n, dtype=object)
+        model_names = np.empty(n, dtype=object)
+        model_types = np.empty(n, dtype=object)
+        response_time = np.empty(n, dtype=np.float64)
+        prompt_tokens = np.empty(n, dtype=np.int64)
+        completion_tokens = np.empty(n, dtype=np.int64)
+        total_tokens = np.empty(n, dtype=np.int64)
+        context_window = np.empty(n, dtype=np.int64)
+        content_length = np.empty(n, dtype=np.int64)
+        
+        for i, response in enumerate(responses):
+            providers[i] = response.provider
+            model_names[i] = response.model_name
+            model_types[i] = response.model_type
+            response_time[i] = response.response_time
+            prompt_tokens[i] = response.token_usage['prompt_tokens']
+            completion_tokens[i] = response.token_usage['completion_tokens']
+            total_tokens[i] = response.token_usage['total_tokens']
+            context_window[i] = response.context_window
+            content_length[i] = len(response.content)
+        
+        # Label columns are categorical so charts reuse one set of codes
+        return pd.DataFrame({
+            'provider': pd.Categorical(providers),
+            'model_name': pd.Categorical(model_names),
+            'model_type': pd.Categorical(model_types),
+            'response_time': response_time,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': total_tokens,
+            'context_window': context_window,
+            'content_length': content_length,
+            'has_error': np.array(['error' in r.metadata for r in responses], dtype=bool)
+        })
+    
+    def _create_response_time_chart(self, df: pd.DataFrame, axes):
+        """Create response time comparison chart."""
+        # Response times
+        ax = axes[0]
+        sns.barplot(data=df, x='provider', y='response_time', hue='model_type', ax=ax)
+        ax.set_title('Response Time by Provider and Model Type')
+        ax.set_ylabel('Response Time (seconds)')
+        ax.tick_params(axis='x', rotation=45)
+        ax.legend(title='Model Type')
+        
+        # Response time distribution
+        ax = axes[1]
+        sns.boxplot(data=df, x='provider', y='response_time', ax=ax)
+        ax.set_title('Response Time Distribution by Provider')
+        ax.set_ylabel('Response Time (seconds)')
+        ax.tick_params(axis='x', rotation=45)
+    
+    def _create_token_usage_chart(self, df: pd.DataFrame, axes):
         """Create token usage comparison chart."""
-        plt.figure(figsize=(15, 8))
-        
         # Stacked bar chart for token usage
-        plt.subplot(2, 2, 1)
-        models = df['model_name'].tolist()
-        prompt_tokens = df['prompt_tokens'].tolist()
-        completion_tokens = df['completion_tokens'].tolist()
+        ax = axes[0]
+        models = df['model_name'].to_numpy()
+        prompt_tokens = df['prompt_tokens'].to_numpy()
+        completion_tokens = df['completion_tokens'].to_numpy()
         
         x = np.arange(len(models))
         width = 0.6
         
-        plt.bar(x, prompt_tokens, width, label='Prompt Tokens', alpha=0.8)
-        plt.bar(x, completion_tokens, width, bottom=prompt_tokens, label='Completion Tokens', alpha=0.8)
+        ax.bar(x, prompt_tokens, width, label='Prompt Tokens', alpha=0.8)
+        ax.bar(x, completion_tokens, width, bottom=prompt_tokens, label='Completion Tokens', alpha=0.8)
         
-        plt.xlabel('Models')
-        plt.ylabel('Token Count')
-        plt.title('Token Usage by Model')
-        plt.xticks(x, models, rotation=45, ha='right')
-        plt.legend()
+        ax.set_xlabel('Models')
+        ax.set_ylabel('Token Count')
+        ax.set_title('Token Usage by Model')
+        ax.set_xticks(x)
+        ax.set_xticklabels(models, rotation=45, ha='right')
+        ax.legend()
         
         # Token efficiency (tokens per second)
-        plt.subplot(2, 2, 2)
+        ax = axes[1]
         df['tokens_per_second'] = df['total_tokens'] / df['response_time']
-        sns.barplot(data=df, x='provider', y='tokens_per_second', hue='model_type')
-        plt.title('Token Generation Efficiency')
-        plt.ylabel('Tokens per Second')
-        plt.xticks(rotation=45)
-        plt.legend(title='Model Type')
+        sns.barplot(data=df, x='provider', y='tokens_per_second', hue='model_type', ax=ax)
+        ax.set_title('Token Generation Efficiency')
+        ax.set_ylabel('Tokens per Second')
+        ax.tick_params(axis='x', rotation=45)
+        ax.legend(title='Model Type')
         
         # Content length vs tokens
-        plt.subplot(2, 2, 3)
-        plt.scatter(df['content_length'], df['total_tokens'], 
-                   c=df['provider'].astype('category').cat.codes, alpha=0.7)
-        plt.xlabel('Content Length (characters)')
-        plt.ylabel('Total Tokens')
-        plt.title('Content Length vs Token Usage')
-        
-        # Add provider legend
-        providers = df['provider'].unique()
-        for i, provider in enumerate(providers):
-            plt.scatter([], [], c=plt.cm.tab10(i), label=provider)
-        plt.legend(title='Provider')
+        ax = axes[2]
+        sns.scatterplot(data=df, x='content_length', y='total_tokens', hue='provider', alpha=0.7, ax=ax)
+        ax.set_xlabel('Content Length (characters)')
+        ax.set_ylabel('Total Tokens')
+        ax.set_title('Content Length vs Token Usage')
+        ax.legend(title='Provider')
         
         # Token usage by model type
-        plt.subplot(2, 2, 4)
-        sns.boxplot(data=df, x='model_type', y='total_tokens')
-        plt.title('Token Usage Distribution by Model Type')
-        plt.ylabel('Total Tokens')
-        plt.xticks(rotation=45)
-        
-        plt.tight_layout()
-        
-        if self.config.should_save_plots():
-            plt.savefig(f"{self.config.get_plot_output_dir()}/token_usage.png", dpi=300, bbox_inches='tight')
-            plt.close()
+        ax = axes[3]
+        sns.boxplot(data=df, x='model_type', y='total_tokens', ax=ax)
+        ax.set_title('Token Usage Distribution by Model Type')
+        ax.set_ylabel('Total Tokens')
+        ax.tick_params(axis='x', rotation=45)
     
-    def _create_context_window_chart(self, df: pd.DataFrame):
+    def _create_context_window_chart(self, df: pd.DataFrame, axes):
         """Create context window comparison chart."""
-        plt.figure(figsize=(10, 6))
-        
         # Context window comparison
-        plt.subplot(1, 2, 1)
-        sns.barplot(data=df, x='provider', y='context_window', hue='model_type')
-        plt.title('Context Window Size by Provider')
-        plt.ylabel('Context Window (tokens)')
-        plt.yscale('log')  # Log scale for better visualization
-        plt.xticks(rotation=45)
-        plt.legend(title='Model Type')
+        ax = axes[0]
+        sns.barplot(data=df, x='provider', y='context_window', hue='model_type', ax=ax)
+        ax.set_title('Context Window Size by Provider')
+        ax.set_ylabel('Context Window (tokens)')
+        ax.set_yscale('log')  # Log scale for better visualization
+        ax.tick_params(axis='x', rotation=45)
+        ax.legend(title='Model Type')
         
         # Context utilization (tokens used vs available)
-        plt.subplot(1, 2, 2)
+        ax = axes[1]
         df['context_utilization'] = (df['total_tokens'] / df['context_window']) * 100
-        sns.barplot(data=df, x='provider', y='context_utilization', hue='model_type')
-        plt.title('Context Window Utilization (%)')
-        plt.ylabel('Utilization Percentage')
-        plt.xticks(rotation=45)
-        plt.legend(title='Model Type')
-        
-        plt.tight_layout()
-        
-        if self.config.should_save_plots():
-            plt.savefig(f"{self.config.get_plot_output_dir()}/context_windows.png", dpi=300, bbox_inches='tight')
-            plt.close()
+        sns.barplot(data=df, x='provider', y='context_utilization', hue='model_type', ax=ax)
+        ax.set_title('Context Window Utilization (%)')
+        ax.set_ylabel('Utilization Percentage')
+        ax.tick_params(axis='x', rotation=45)
+        ax.legend(title='Model Type')
     
     def _create_summary_table(self, responses: List[ModelResponse]):
         """Create a summary table of results."""
@@ -216,54 +321,51 @@ class Visualizer:
         
         df = self._responses_to_dataframe(responses)
         
-        # Calculate performance metrics
-        performance_metrics = []
-        for _, row in df.iterrows():
-            metrics = {
-                'model': f"{row['provider']}/{row['model_name']}",
-                'speed_score': 1 / row['response_time'],  # Higher is better
-                'efficiency_score': row['total_tokens'] / row['response_time'],  # Tokens per second
-                'context_efficiency': row['context_window'] / 1000,  # Normalized context window
-                'overall_score': 0  # Will be calculated
-            }
-            
-            # Calculate overall score (normalized)
-            metrics['overall_score'] = (
-                (metrics['speed_score'] * 0.4) +
-                (metrics['efficiency_score'] * 0.4) +
-                (metrics['context_efficiency'] * 0.2)
-            )
-            
-            performance_metrics.append(metrics)
+        # Calculate performance metrics column-wise
+        speed_score = 1 / df['response_time']  # Higher is better
+        efficiency_score = df['total_tokens'] / df['response_time']  # Tokens per second
+        context_efficiency = df['context_window'] / 1000  # Normalized context window
+        
+        # Create performance DataFrame with the overall (weighted) score
+        perf_df = pd.DataFrame({
+            'model': df['provider'].astype(str) + '/' + df['model_name'].astype(str),
+            'speed_score': speed_score,
+            'efficiency_score': efficiency_score,
+            'context_efficiency': context_efficiency,
+            'overall_score': 0.4 * speed_score + 0.4 * efficiency_score + 0.2 * context_efficiency
+        })
         
-        # Create performance DataFrame
-        perf_df = pd.DataFrame(performance_metrics)
+        # Skip drawing when the figure would be neither saved nor shown
+        if not self.config.should_save_plots() and not _has_display():
+            return perf_df
         
         # Visualize performance comparison
-        plt.figure(figsize=(12, 8))
+        fig, axes = plt.subplots(nrows=1, ncols=2, figsize=(12, 5))
         
         # Overall performance ranking
-        plt.subplot(2, 2, 1)
-        perf_df_sorted = perf_df.sort_values('overall_score', ascending=True)
-        plt.barh(perf_df_sorted['model'], perf_df_sorted['overall_score'])
-        plt.title('Overall Performance Ranking')
-        plt.xlabel('Performance Score')
+        ax = axes[0]
+        scores = perf_df['overall_score'].to_numpy()
+        order = np.argsort(scores)
+        ax.barh(perf_df['model'].to_numpy()[order], scores[order])
+        ax.set_title('Overall Performance Ranking')
+        ax.set_xlabel('Performance Score')
         
         # Speed vs Efficiency scatter
-        plt.subplot(2, 2, 2)
-        plt.scatter(perf_df['speed_score'], perf_df['efficiency_score'], alpha=0.7)
-        for i, model in enumerate(perf_df['model']):
-            plt.annotate(model.split('/')[-1], 
-                        (perf_df.iloc[i]['speed_score'], perf_df.iloc[i]['efficiency_score']),
-                        fontsize=8, alpha=0.7)
-        plt.xlabel('Speed Score')
-        plt.ylabel('Efficiency Score')
-        plt.title('Speed vs Efficiency')
-        
-        plt.tight_layout()
+        ax = axes[1]
+        xs = perf_df['speed_score'].to_numpy()
+        ys = perf_df['efficiency_score'].to_numpy()
+        labels = [model.rsplit('/', 1)[-1] for model in perf_df['model']]
+        ax.scatter(xs, ys, alpha=0.7)
+        for x, y, label in zip(xs, ys, labels):
+            ax.annotate(label, (x, y), fontsize=8, alpha=0.7)
+        ax.set_xlabel('Speed Score')
+        ax.set_ylabel('Efficiency Score')
+        ax.set_title('Speed vs Efficiency')
+        
+        fig.tight_layout()
         
         if self.config.should_save_plots():
-            plt.savefig(f"{self.config.get_plot_output_dir()}/performance_comparison.png", dpi=300, bbox_inches='tight')
-            plt.close()
+            self._save_figure(fig, "performance_comparison.png")
+            self._wait_for_saves()
         
         return perf_df
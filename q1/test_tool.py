@@ -18,6 +18,21 @@ sys.path.append(str(script_dir / "src"))
 from config import Config
 
 
+def existing_files(paths):
+    """Return which of the given relative paths exist, scanning each directory once."""
+    present = set()
+    for directory in {os.path.dirname(path) for path in paths}:
+        try:
+            with os.scandir(directory or ".") as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        present.add(os.path.join(directory, entry.name).replace(os.sep, "/"))
+        except OSError:
+            continue
+    
+    return present
+
+
 def test_config_loading():
     """Test configuration loading."""
     print("Testing configuration loading...")
@@ -78,8 +93,9 @@ def test_provider_interfaces():
             "src/providers/huggingface_provider.py"
         ]
 
+        present = existing_files(provider_files)
         for provider_file in provider_files:
-            if Path(provider_file).exists():
+            if provider_file in present:
                 print(f"✓ {provider_file} exists")
             else:
                 print(f"✗ {provider_file} missing")
@@ -143,6 +159,8 @@ def test_file_structure():
         "src/config.py",
         "src/cli.py",
         "src/model_manager.py",
+        "src/rate_limit.py",
+        "src/llm_cache.py",
         "src/visualization.py",
         "src/providers/__init__.py",
         "src/providers/base.py",
@@ -151,10 +169,8 @@ def test_file_structure():
         "src/providers/huggingface_provider.py"
     ]
     
-    missing_files = []
-    for file_path in required_files:
-        if not Path(file_path).exists():
-            missing_files.append(file_path)
+    present = existing_files(required_files)
+    missing_files = [file_path for file_path in required_files if file_path not in present]
     
     if missing_files:
         print(f"✗ Missing files: {missing_files}")
@@ -3,7 +3,7 @@ Configuration settings for the Multimodal QA backend.
 """
 
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, FrozenSet, Optional
 from dataclasses import dataclass
 
 @dataclass
@@ -15,6 +15,7 @@ class ModelConfig:
     max_tokens: int
     temperature: float
     priority: int  # Lower number = higher priority
+    timeout_s: Optional[float] = None  # Per-call timeout; defaults to request_timeout
 
 @dataclass
 class APIConfig:
@@ -23,8 +24,11 @@ class APIConfig:
     anthropic_api_key: str
     google_api_key: str
     max_file_size_mb: int
-    allowed_image_types: List[str]
+    allowed_image_types: FrozenSet[str]
     request_timeout: int
+    hedge_delay: Optional[float]  # Seconds before the next vision model is also tried; None disables hedging
+    openai_concurrency: int  # Max in-flight requests per provider
+    anthropic_concurrency: int
 
 class Config:
     """Main configuration class."""
@@ -35,11 +39,16 @@ class Config:
             anthropic_api_key=os.getenv("ANTHROPIC_API_KEY", ""),
             google_api_key=os.getenv("GOOGLE_API_KEY", ""),
             max_file_size_mb=int(os.getenv("MAX_FILE_SIZE_MB", "10")),
-            allowed_image_types=[
+            allowed_image_types=frozenset([
                 "image/jpeg", "image/jpg", "image/png", 
                 "image/gif", "image/bmp", "image/webp"
-            ],
-            request_timeout=int(os.getenv("REQUEST_TIMEOUT", "30"))
+            ]),
+            request_timeout=int(os.getenv("REQUEST_TIMEOUT", "30")),
+            # Opt-in: every hedge is an extra paid provider call, and vision
+            # calls routinely take 3-10s
+            hedge_delay=float(os.environ["VISION_HEDGE_DELAY"]) if os.getenv("VISION_HEDGE_DELAY") else None,
+            openai_concurrency=int(os.getenv("OPENAI_CONCURRENCY", "5")),
+            anthropic_concurrency=int(os.getenv("ANTHROPIC_CONCURRENCY", "5"))
         )
         
         self.models = [
@@ -68,36 +77,47 @@ class Config:
                 priority=3
             )
         ]
+        
+        # Models and API keys don't change after startup, so filter them once
+        self._vision_models = self._available_models(supports_vision=True)
+        self._fallback_models = self._available_models(supports_vision=False)
+    
+    def _has_api_key(self, provider: str) -> bool:
+        """Check whether an API key is configured for a provider."""
+        api_keys = {
+            "openai": self.api.openai_api_key,
+            "anthropic": self.api.anthropic_api_key,
+            "google": self.api.google_api_key
+        }
+        return bool(api_keys.get(provider))
+    
+    def _available_models(self, supports_vision: bool) -> List[ModelConfig]:
+        """Filter models by vision support and API key, sorted by priority."""
+        available_models = [
+            m for m in self.models
+            if m.supports_vision == supports_vision and self._has_api_key(m.provider)
+        ]
+        return sorted(available_models, key=lambda x: x.priority)
     
     def get_available_vision_models(self) -> List[ModelConfig]:
         """Get list of available vision models sorted by priority."""
-        vision_models = [m for m in self.models if m.supports_vision]
-        
-        # Filter by available API keys
-        available_models = []
-        for model in vision_models:
-            if model.provider == "openai" and self.api.openai_api_key:
-                available_models.append(model)
-            elif model.provider == "anthropic" and self.api.anthropic_api_key:
-                available_models.append(model)
-            elif model.provider == "google" and self.api.google_api_key:
-                available_models.append(model)
-        
-        return sorted(available_models, key=lambda x: x.priority)
+        return self._vision_models
     
     def get_fallback_models(self) -> List[ModelConfig]:
         """Get list of available fallback (text-only) models."""
-        fallback_models = [m for m in self.models if not m.supports_vision]
-        
-        # Filter by available API keys
-        available_models = []
-        for model in fallback_models:
-            if model.provider == "openai" and self.api.openai_api_key:
-                available_models.append(model)
-            elif model.provider == "anthropic" and self.api.anthropic_api_key:
-                available_models.append(model)
-        
-        return sorted(available_models, key=lambda x: x.priority)
+        return self._fallback_models
+    
+    def get_provider_concurrency(self, provider: str) -> int:
+        """Get the maximum number of concurrent requests to a provider."""
+        limits = {
+            "openai": self.api.openai_concurrency,
+            "anthropic": self.api.anthropic_concurrency
+        }
+        return max(1, limits.get(provider, 5))
+    
+    def get_model_timeout(self, model: ModelConfig) -> float:
+        """Get the timeout in seconds for a single call to a model."""
+        return model.timeout_s or self.api.request_timeout
     
     def is_image_type_allowed(self, content_type: str) -> bool:
         """Check if the image content type is allowed."""
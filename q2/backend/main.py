@@ -4,19 +4,19 @@ FastAPI server for handling image uploads and multimodal question answering.
 """
 
 import os
-import base64
-import requests
+import json
+import httpx
 from io import BytesIO
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator
 from fastapi import FastAPI, File, UploadFile, HTTPException, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from PIL import Image
 import logging
 from dotenv import load_dotenv
 from config import config
-from model_service import model_service
+from model_service import get_model_service
 
 # Load environment variables
 load_dotenv()
@@ -38,6 +38,23 @@ app.add_middleware(
 
 # Configuration is now handled by config.py and model_service.py
 
+# Uploads are read in chunks of this size so oversized files are rejected early
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Shared async client so URL downloads don't block the event loop and
+# repeat hosts reuse pooled connections
+http_client = httpx.AsyncClient(
+    http2=True,
+    timeout=config.api.request_timeout,
+    follow_redirects=True
+)
+
+@app.on_event("shutdown")
+async def close_http_client():
+    """Close pooled connections when the server stops."""
+    await http_client.aclose()
+    await get_model_service().close()
+
 class QuestionRequest(BaseModel):
     question: str
     image_url: Optional[str] = None
@@ -51,46 +68,104 @@ class AnalysisResponse(BaseModel):
     fallback_used: bool = False
     error: Optional[str] = None
 
-def encode_image_to_base64(image_data: bytes) -> str:
-    """Convert image bytes to base64 string."""
-    return base64.b64encode(image_data).decode('utf-8')
+def sniff_image_type(image_data: bytes) -> Optional[str]:
+    """Identify the image MIME type from its leading magic bytes."""
+    head = image_data[:12]
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head.startswith(b"BM"):
+        return "image/bmp"
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
 
 def validate_image(image_data: bytes) -> bool:
     """Validate if the uploaded data is a valid image."""
     try:
-        image = Image.open(BytesIO(image_data))
-        # Check if it's a valid image format
-        image.verify()
-
         # Check file size
         if len(image_data) > config.get_max_file_size_bytes():
             return False
 
-        return True
+        # Full PIL header parse, kept for debugging unusual files
+        if os.getenv("VALIDATE_IMAGES_WITH_PIL", "false").lower() == "true":
+            with Image.open(BytesIO(image_data)):
+                pass
+            return True
+
+        # Check the format against the allowed types from the magic bytes
+        image_type = sniff_image_type(image_data)
+        return image_type is not None and config.is_image_type_allowed(image_type)
     except Exception as e:
         logger.error(f"Image validation failed: {e}")
         return False
 
-def download_image_from_url(url: str) -> bytes:
+async def read_upload(file: UploadFile) -> bytes:
+    """Read an upload in chunks, rejecting it as soon as it exceeds the size limit."""
+    max_bytes = config.get_max_file_size_bytes()
+    chunks = []
+    total = 0
+
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+
+        total += len(chunk)
+        if total > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Image file too large. Maximum size: {config.api.max_file_size_mb}MB"
+            )
+        chunks.append(chunk)
+
+    return b"".join(chunks)
+
+async def download_image_from_url(url: str) -> bytes:
     """Download image from URL and return bytes."""
+    max_bytes = config.get_max_file_size_bytes()
+    too_large = f"Image file too large. Maximum size: {config.api.max_file_size_mb}MB"
+
     try:
-        response = requests.get(url, timeout=config.api.request_timeout)
-        response.raise_for_status()
+        async with http_client.stream("GET", url) as response:
+            response.raise_for_status()
 
-        # Validate content type
-        content_type = response.headers.get('content-type', '')
-        if not config.is_image_type_allowed(content_type):
-            raise ValueError(f"URL does not point to a valid image. Content-Type: {content_type}")
+            # Validate content type
+            content_type = response.headers.get('content-type', '')
+            if not config.is_image_type_allowed(content_type):
+                raise ValueError(f"URL does not point to a valid image. Content-Type: {content_type}")
 
-        # Check file size
-        if len(response.content) > config.get_max_file_size_bytes():
-            raise ValueError(f"Image file too large. Maximum size: {config.api.max_file_size_mb}MB")
+            # Reject by declared size before transferring the body
+            content_length = response.headers.get('content-length')
+            if content_length and int(content_length) > max_bytes:
+                raise ValueError(too_large)
+
+            # Check file size while streaming
+            data = bytearray()
+            async for chunk in response.aiter_bytes(UPLOAD_CHUNK_SIZE):
+                data.extend(chunk)
+                if len(data) > max_bytes:
+                    raise ValueError(too_large)
 
-        return response.content
+        return bytes(data)
     except Exception as e:
         logger.error(f"Failed to download image from URL: {e}")
         raise HTTPException(status_code=400, detail=f"Failed to download image: {str(e)}")
 
+async def stream_analysis(question: str, image_data: bytes) -> AsyncIterator[str]:
+    """Relay model service events to the client as server-sent events."""
+    try:
+        async for event in get_model_service().analyze_image_stream(question, image_data):
+            yield f"data: {json.dumps(event)}\n\n"
+    except Exception as e:
+        # Headers are already sent, so errors are reported in-stream
+        logger.error(f"Streaming analysis failed: {e}")
+        error = {"type": "error", "error": f"Analysis failed: {str(e)}"}
+        yield f"data: {json.dumps(error)}\n\n"
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
@@ -99,7 +174,7 @@ async def root():
 @app.get("/status")
 async def get_status():
     """Get API and model status."""
-    return model_service.get_model_status()
+    return get_model_service().get_model_status()
 
 @app.post("/upload", response_model=AnalysisResponse)
 async def upload_and_analyze(
@@ -109,15 +184,12 @@ async def upload_and_analyze(
     """Upload an image and analyze it with a question."""
     try:
         # Read and validate image
-        image_data = await file.read()
+        image_data = await read_upload(file)
         if not validate_image(image_data):
             raise HTTPException(status_code=400, detail="Invalid image format or file too large")
 
-        # Convert to base64
-        image_base64 = encode_image_to_base64(image_data)
-
         # Analyze using model service
-        result = await model_service.analyze_image(question, image_base64)
+        result = await get_model_service().analyze_image(question, image_data)
 
         return AnalysisResponse(
             answer=result["answer"],
@@ -140,17 +212,14 @@ async def analyze_image_url(request: QuestionRequest):
 
     try:
         # Download image from URL
-        image_data = download_image_from_url(request.image_url)
+        image_data = await download_image_from_url(request.image_url)
 
         # Validate image
         if not validate_image(image_data):
             raise HTTPException(status_code=400, detail="URL does not point to a valid image or file too large")
 
-        # Convert to base64
-        image_base64 = encode_image_to_base64(image_data)
-
         # Analyze using model service
-        result = await model_service.analyze_image(request.question, image_base64)
+        result = await get_model_service().analyze_image(request.question, image_data)
 
         return AnalysisResponse(
             answer=result["answer"],
@@ -165,6 +234,30 @@ async def analyze_image_url(request: QuestionRequest):
         logger.error(f"URL analysis failed: {e}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@app.post("/upload/stream")
+async def upload_and_analyze_stream(
+    file: UploadFile = File(...),
+    question: str = Form(...)
+):
+    """Upload an image and stream the answer as it is generated."""
+    image_data = await read_upload(file)
+    if not validate_image(image_data):
+        raise HTTPException(status_code=400, detail="Invalid image format or file too large")
+
+    return StreamingResponse(stream_analysis(question, image_data), media_type="text/event-stream")
+
+@app.post("/analyze-url/stream")
+async def analyze_image_url_stream(request: QuestionRequest):
+    """Analyze an image from URL and stream the answer as it is generated."""
+    if not request.image_url:
+        raise HTTPException(status_code=400, detail="Image URL is required")
+
+    image_data = await download_image_from_url(request.image_url)
+    if not validate_image(image_data):
+        raise HTTPException(status_code=400, detail="URL does not point to a valid image or file too large")
+
+    return StreamingResponse(stream_analysis(request.question, image_data), media_type="text/event-stream")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -3,61 +3,286 @@ Model service for handling multimodal AI requests with fallback support.
 """
 
 import time
+import asyncio
+import base64
+import functools
+import hashlib
 import logging
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
+import httpx
 import openai
 import anthropic
 from config import config, ModelConfig
 
 logger = logging.getLogger(__name__)
 
+# Number of (image, question) analyses kept for repeated requests
+ANALYSIS_CACHE_SIZE = 512
+
+# Images at least this large (bytes) are base64-encoded in a worker thread
+# so the encoding doesn't stall other requests on the event loop
+THREADED_ENCODE_MIN_BYTES = 256 * 1024
+
+# Attempts per provider call for transient errors, with exponential backoff
+# starting at RETRY_BASE_DELAY seconds between them
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+
+# Seconds a /status payload is reused; it only changes with config/API keys
+STATUS_CACHE_TTL = 5.0
+
+# Errors worth retrying on the same model before falling back to another one
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    anthropic.RateLimitError,
+    anthropic.APIConnectionError,
+    anthropic.InternalServerError,
+    TimeoutError
+)
+
 class ModelService:
     """Service for managing multimodal AI model requests."""
     
     def __init__(self):
-        self.openai_client = None
-        self.anthropic_client = None
-        
-        # Initialize clients if API keys are available
-        if config.api.openai_api_key:
-            self.openai_client = openai.OpenAI(api_key=config.api.openai_api_key)
-        
-        if config.api.anthropic_api_key:
-            self.anthropic_client = anthropic.Anthropic(api_key=config.api.anthropic_api_key)
+        # Clients are created on first use, and only for providers with an API
+        # key. The async clients let the event loop serve other requests while
+        # a model call is in flight
+        self._openai_client = None
+        self._anthropic_client = None
+        self._http = None
+        self._semaphores = {}  # provider -> asyncio.Semaphore, created on first use
+        self._cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()  # LRU of analyses
+        self._status_cache: Optional[Tuple[float, Dict[str, Any]]] = None  # (built at, status)
     
-    async def analyze_image(self, question: str, image_base64: str) -> Dict[str, Any]:
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Pooled HTTP/2 client shared by both SDKs, so concurrent model calls reuse connections."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                timeout=httpx.Timeout(60.0, connect=5.0)
+            )
+        return self._http
+    
+    @property
+    def openai_client(self) -> Optional[openai.AsyncOpenAI]:
+        """OpenAI client, or None if no OpenAI API key is configured."""
+        if self._openai_client is None and config.api.openai_api_key:
+            self._openai_client = openai.AsyncOpenAI(
+                api_key=config.api.openai_api_key,
+                http_client=self.http_client,
+                max_retries=0  # Retried by _call_model, with fallback on top
+            )
+        return self._openai_client
+    
+    @property
+    def anthropic_client(self) -> Optional[anthropic.AsyncAnthropic]:
+        """Anthropic client, or None if no Anthropic API key is configured."""
+        if self._anthropic_client is None and config.api.anthropic_api_key:
+            self._anthropic_client = anthropic.AsyncAnthropic(
+                api_key=config.api.anthropic_api_key,
+                http_client=self.http_client,
+                max_retries=0
+            )
+        return self._anthropic_client
+    
+    async def close(self):
+        """Close the shared HTTP connection pool, if it was opened."""
+        if self._http is not None:
+            await self._http.aclose()
+    
+    async def analyze_image(self, question: str, image_bytes: bytes) -> Dict[str, Any]:
         """
         Analyze an image with a question using the best available model.
         
         Args:
             question: The question to ask about the image
-            image_base64: Base64 encoded image data
+            image_bytes: Raw image data
             
         Returns:
             Dictionary containing the analysis result
         """
+        # Repeated questions about the same image skip the provider round trip
+        start_time = time.time()
+        cache_key = (hashlib.blake2b(image_bytes, digest_size=16).hexdigest(), question)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self._cache.move_to_end(cache_key)
+            return {**cached, "processing_time": time.time() - start_time, "cache_hit": True}
+        
         vision_models = config.get_available_vision_models()
         
         if not vision_models:
             logger.warning("No vision models available, using fallback")
             return await self._fallback_analysis(question)
         
-        # Try each vision model in order of priority
+        # Both provider APIs take base64 image data; encode it once here rather
+        # than per model, and only when a vision model will actually be tried
+        image_base64 = await self._encode_image(image_bytes)
+        
+        result = await self._race_vision_models(vision_models, question, image_base64)
+        if result is not None:
+            result["fallback_used"] = False
+            self._cache_result(cache_key, result)
+            return result
+        
+        # If all vision models fail, use fallback
+        logger.warning("All vision models failed, using fallback")
+        result = await self._fallback_analysis(question)
+        result["fallback_used"] = True
+        return result
+    
+    async def analyze_batch(self, items: List[Tuple[str, bytes]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several (question, image) pairs concurrently.
+        
+        Args:
+            items: Pairs of question and raw image data
+            
+        Returns:
+            Analysis results in the same order as the items
+        """
+        # Each analysis still goes through the cache, provider caps and fallback
+        return list(await asyncio.gather(
+            *(self.analyze_image(question, image_bytes) for question, image_bytes in items)
+        ))
+    
+    async def analyze_image_stream(self, question: str, image_bytes: bytes) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze an image with a question, yielding the answer as it is generated.
+        
+        Args:
+            question: The question to ask about the image
+            image_bytes: Raw image data
+            
+        Yields:
+            {"type": "delta", "text": ...} events, then one {"type": "done", ...}
+            event carrying the full analysis result
+        """
+        start_time = time.time()
+        cache_key = (hashlib.blake2b(image_bytes, digest_size=16).hexdigest(), question)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self._cache.move_to_end(cache_key)
+            yield {"type": "delta", "text": cached["answer"]}
+            yield {"type": "done", **cached, "processing_time": time.time() - start_time, "cache_hit": True}
+            return
+        
+        vision_models = config.get_available_vision_models()
+        image_base64 = await self._encode_image(image_bytes) if vision_models else None
+        
+        # Models are tried in priority order, each until it produces its first
+        # chunk; once text has been sent a failure can't move to another model
         for model in vision_models:
+            logger.info(f"Streaming analysis with {model.name}")
+            chunks = []
             try:
-                logger.info(f"Attempting analysis with {model.name}")
-                result = await self._analyze_with_model(model, question, image_base64)
-                result["fallback_used"] = False
-                return result
+                async for text in self._stream_with_model(model, question, image_base64):
+                    chunks.append(text)
+                    yield {"type": "delta", "text": text}
             except Exception as e:
+                if chunks:
+                    raise
                 logger.warning(f"Model {model.name} failed: {e}")
                 continue
+            
+            result = {
+                "answer": "".join(chunks),
+                "model_used": model.name,
+                "processing_time": time.time() - start_time,
+                "tokens_used": None,
+                "provider": model.provider,
+                "fallback_used": False
+            }
+            self._cache_result(cache_key, result)
+            yield {"type": "done", **result}
+            return
         
         # If all vision models fail, use fallback
-        logger.warning("All vision models failed, using fallback")
+        logger.warning("No vision model could stream an answer, using fallback")
         result = await self._fallback_analysis(question)
         result["fallback_used"] = True
-        return result
+        yield {"type": "delta", "text": result["answer"]}
+        yield {"type": "done", **result}
+    
+    async def _encode_image(self, image_bytes: bytes) -> str:
+        """Base64-encode image data, off the event loop for large images."""
+        if len(image_bytes) < THREADED_ENCODE_MIN_BYTES:
+            return base64.b64encode(image_bytes).decode('ascii')
+        
+        loop = asyncio.get_running_loop()
+        encoded = await loop.run_in_executor(None, base64.b64encode, image_bytes)
+        return encoded.decode('ascii')
+    
+    def _cache_result(self, cache_key: Tuple[str, str], result: Dict[str, Any]):
+        """Store an analysis, evicting the least recently used one when full."""
+        self._cache[cache_key] = dict(result)
+        if len(self._cache) > ANALYSIS_CACHE_SIZE:
+            self._cache.popitem(last=False)
+    
+    async def _race_vision_models(
+        self,
+        vision_models: List[ModelConfig],
+        question: str,
+        image_base64: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the first successful analysis from the vision models.
+        
+        Models start in priority order: the next one is launched when a running
+        model fails, or, if hedging is enabled, when hedge_delay seconds pass
+        without an answer, so a slow or stuck primary no longer holds up the
+        others. Models still
+        running once one succeeds are cancelled and awaited before returning,
+        so their provider slots and connections are released first.
+        """
+        remaining = list(vision_models)
+        running = {}  # task -> model
+        hedge_delay = config.api.hedge_delay  # None: only move on after a failure
+        
+        try:
+            while remaining or running:
+                if remaining:
+                    model = remaining.pop(0)
+                    logger.info(f"Attempting analysis with {model.name}")
+                    task = asyncio.ensure_future(self._analyze_with_model(model, question, image_base64))
+                    running[task] = model
+                
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=hedge_delay if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                # Look at every finished task before returning, so no failure
+                # is left unretrieved
+                result = None
+                for task in done:
+                    model = running.pop(task)
+                    if task.cancelled():
+                        logger.warning(f"Model {model.name} was cancelled")
+                    elif task.exception() is not None:
+                        logger.warning(f"Model {model.name} failed: {task.exception()}")
+                    elif result is None:
+                        result = task.result()
+                
+                if result is not None:
+                    return result
+            
+            return None
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.wait(running)
+                # A task may have failed before its cancel landed
+                for task in running:
+                    if not task.cancelled():
+                        task.exception()
     
     async def _analyze_with_model(
         self, 
@@ -69,11 +294,54 @@ class ModelService:
         start_time = time.time()
         
         if model.provider == "openai":
-            return await self._analyze_with_openai(model, question, image_base64, start_time)
+            analyze = self._analyze_with_openai
         elif model.provider == "anthropic":
-            return await self._analyze_with_anthropic(model, question, image_base64, start_time)
+            analyze = self._analyze_with_anthropic
         else:
             raise ValueError(f"Unsupported provider: {model.provider}")
+        
+        return await self._call_model(
+            model, functools.partial(analyze, model, question, image_base64, start_time)
+        )
+    
+    def _provider_semaphore(self, provider: str) -> asyncio.Semaphore:
+        """Get the semaphore capping concurrent requests to a provider."""
+        # Created lazily so it binds to the server's running event loop
+        if provider not in self._semaphores:
+            self._semaphores[provider] = asyncio.Semaphore(config.get_provider_concurrency(provider))
+        return self._semaphores[provider]
+    
+    async def _call_model(self, model: ModelConfig, make_call):
+        """Run a provider call, retrying transient errors with exponential backoff."""
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                return await self._call_once(model, make_call())
+            except RETRYABLE_ERRORS as e:
+                if attempt + 1 == RETRY_ATTEMPTS:
+                    raise
+                
+                delay = RETRY_BASE_DELAY * 2 ** attempt
+                logger.info(f"Model {model.name} attempt {attempt + 1} failed ({e}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+    
+    async def _call_once(self, model: ModelConfig, call):
+        """Await a provider call under the provider's concurrency cap and the model's timeout."""
+        timeout = config.get_model_timeout(model)
+        
+        # Requests over the cap wait here; the timeout starts once a slot is free
+        semaphore = self._provider_semaphore(model.provider)
+        try:
+            await semaphore.acquire()
+        except BaseException:
+            call.close()  # Cancelled while queued; the call never started
+            raise
+        
+        try:
+            return await asyncio.wait_for(call, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"{model.name} did not respond within {timeout}s")
+        finally:
+            semaphore.release()
     
     async def _analyze_with_openai(
         self, 
@@ -86,23 +354,9 @@ class ModelService:
         if not self.openai_client:
             raise ValueError("OpenAI client not initialized")
         
-        response = self.openai_client.chat.completions.create(
+        response = await self.openai_client.chat.completions.create(
             model=model.name,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": question},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{image_base64}",
-                                "detail": "high"
-                            }
-                        }
-                    ]
-                }
-            ],
+            messages=self._openai_messages(question, image_base64),
             max_tokens=model.max_tokens,
             temperature=model.temperature
         )
@@ -128,29 +382,11 @@ class ModelService:
         if not self.anthropic_client:
             raise ValueError("Anthropic client not initialized")
         
-        response = self.anthropic_client.messages.create(
+        response = await self.anthropic_client.messages.create(
             model=model.name,
             max_tokens=model.max_tokens,
             temperature=model.temperature,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": "image/jpeg",
-                                "data": image_base64
-                            }
-                        },
-                        {
-                            "type": "text",
-                            "text": question
-                        }
-                    ]
-                }
-            ]
+            messages=self._anthropic_messages(question, image_base64)
         )
         
         processing_time = time.time() - start_time
@@ -166,6 +402,126 @@ class ModelService:
             "provider": model.provider
         }
     
+    def _openai_messages(self, question: str, image_base64: str) -> List[Dict[str, Any]]:
+        """Build the OpenAI chat messages for an image question."""
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": question},
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:image/jpeg;base64,{image_base64}",
+                            "detail": "high"
+                        }
+                    }
+                ]
+            }
+        ]
+    
+    def _anthropic_messages(self, question: str, image_base64: str) -> List[Dict[str, Any]]:
+        """Build the Anthropic messages for an image question."""
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": "image/jpeg",
+                            "data": image_base64
+                        }
+                    },
+                    {
+                        "type": "text",
+                        "text": question
+                    }
+                ]
+            }
+        ]
+    
+    async def _stream_with_model(
+        self,
+        model: ModelConfig,
+        question: str,
+        image_base64: str
+    ) -> AsyncIterator[str]:
+        """
+        Stream answer text from a specific model as it is generated.
+        
+        The provider slot is held until the stream ends, and the model's
+        timeout applies to the first chunk rather than the whole answer.
+        """
+        if model.provider == "openai":
+            stream = self._stream_openai(model, question, image_base64)
+        elif model.provider == "anthropic":
+            stream = self._stream_anthropic(model, question, image_base64)
+        else:
+            raise ValueError(f"Unsupported provider: {model.provider}")
+        
+        timeout = config.get_model_timeout(model)
+        
+        async with self._provider_semaphore(model.provider):
+            try:
+                try:
+                    first = await asyncio.wait_for(stream.__anext__(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"{model.name} did not respond within {timeout}s")
+                except StopAsyncIteration:
+                    return
+                
+                yield first
+                async for text in stream:
+                    yield text
+            finally:
+                await stream.aclose()
+    
+    async def _stream_openai(
+        self,
+        model: ModelConfig,
+        question: str,
+        image_base64: str
+    ) -> AsyncIterator[str]:
+        """Stream answer text from OpenAI."""
+        if not self.openai_client:
+            raise ValueError("OpenAI client not initialized")
+        
+        stream = await self.openai_client.chat.completions.create(
+            model=model.name,
+            messages=self._openai_messages(question, image_base64),
+            max_tokens=model.max_tokens,
+            temperature=model.temperature,
+            stream=True
+        )
+        
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    async def _stream_anthropic(
+        self,
+        model: ModelConfig,
+        question: str,
+        image_base64: str
+    ) -> AsyncIterator[str]:
+        """Stream answer text from Anthropic."""
+        if not self.anthropic_client:
+            raise ValueError("Anthropic client not initialized")
+        
+        stream = await self.anthropic_client.messages.create(
+            model=model.name,
+            max_tokens=model.max_tokens,
+            temperature=model.temperature,
+            messages=self._anthropic_messages(question, image_base64),
+            stream=True
+        )
+        
+        async for event in stream:
+            if event.type == "content_block_delta" and event.delta.text:
+                yield event.delta.text
+    
     async def _fallback_analysis(self, question: str) -> Dict[str, Any]:
         """Perform fallback text-only analysis."""
         start_time = time.time()
@@ -185,7 +541,8 @@ class ModelService:
         for model in fallback_models:
             try:
                 if model.provider == "openai" and self.openai_client:
-                    response = self.openai_client.chat.completions.create(
+                    response = await self._call_model(model, functools.partial(
+                        self.openai_client.chat.completions.create,
                         model=model.name,
                         messages=[
                             {
@@ -195,7 +552,7 @@ class ModelService:
                         ],
                         max_tokens=model.max_tokens,
                         temperature=model.temperature
-                    )
+                    ))
                     
                     return {
                         "answer": response.choices[0].message.content,
@@ -219,8 +576,22 @@ class ModelService:
             "fallback_used": True
         }
     
+    def invalidate_status(self):
+        """Drop the cached model status, e.g. after the config changes."""
+        self._status_cache = None
+    
     def get_model_status(self) -> Dict[str, Any]:
-        """Get the status of available models."""
+        """Get the status of available models, cached for STATUS_CACHE_TTL seconds."""
+        now = time.monotonic()
+        if self._status_cache and now - self._status_cache[0] < STATUS_CACHE_TTL:
+            return self._status_cache[1]
+        
+        status = self._build_model_status()
+        self._status_cache = (now, status)
+        return status
+    
+    def _build_model_status(self) -> Dict[str, Any]:
+        """Build the status payload from the current config."""
         vision_models = config.get_available_vision_models()
         fallback_models = config.get_fallback_models()
         
@@ -246,5 +617,7 @@ class ModelService:
             "google_configured": bool(config.api.google_api_key)
         }
 
-# Global model service instance
-model_service = ModelService()
+@functools.lru_cache(maxsize=1)
+def get_model_service() -> ModelService:
+    """Get the shared model service, creating it on first use."""
+    return ModelService()
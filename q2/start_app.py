@@ -10,12 +10,15 @@ import subprocess
 import time
 import threading
 from pathlib import Path
+from urllib.error import URLError
+from urllib.request import urlopen
+
+BACKEND_URL = "http://127.0.0.1:8000/"
 
 def start_backend():
     """Start the FastAPI backend server."""
     print("🚀 Starting backend server...")
     backend_dir = Path(__file__).parent / "backend"
-    os.chdir(backend_dir)
     
     try:
         subprocess.run([
@@ -24,25 +27,43 @@ def start_backend():
             "--host", "0.0.0.0", 
             "--port", "8000", 
             "--reload"
-        ], check=True)
+        ], cwd=backend_dir, check=True)
     except KeyboardInterrupt:
         print("\n👋 Backend server stopped")
     except subprocess.CalledProcessError as e:
         print(f"❌ Backend failed: {e}")
 
+def wait_for_backend(timeout: float = 15.0) -> bool:
+    """Poll the backend health endpoint until it responds or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urlopen(BACKEND_URL, timeout=0.3):
+                return True
+        except (URLError, OSError):
+            time.sleep(0.1)
+    return False
+
 def start_frontend():
     """Start the React frontend server."""
     print("🎨 Starting frontend server...")
     frontend_dir = Path(__file__).parent / "frontend"
-    os.chdir(frontend_dir)
     
     try:
-        subprocess.run(["npm", "start"], check=True)
+        subprocess.run(["npm", "start"], cwd=frontend_dir, check=True)
     except KeyboardInterrupt:
         print("\n👋 Frontend server stopped")
     except subprocess.CalledProcessError as e:
         print(f"❌ Frontend failed: {e}")
 
+def _dir_entries(directory: Path) -> set:
+    """Get the names in a directory with a single scandir pass."""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries}
+    except FileNotFoundError:
+        return set()
+
 def check_requirements():
     """Check if all requirements are met."""
     print("🔍 Checking requirements...")
@@ -52,32 +73,37 @@ def check_requirements():
         print("❌ Python 3.8+ required")
         return False
     
-    # Check Node.js
-    try:
-        result = subprocess.run(["node", "--version"], capture_output=True, text=True)
-        if result.returncode != 0:
-            print("❌ Node.js not found")
+    # Check Node.js (the version is cached in the environment for the session)
+    node_version = os.environ.get("_CACHED_NODE_VERSION")
+    if not node_version:
+        try:
+            result = subprocess.run(["node", "--version"], capture_output=True, text=True)
+            if result.returncode != 0:
+                print("❌ Node.js not found")
+                return False
+            node_version = result.stdout.strip()
+            os.environ["_CACHED_NODE_VERSION"] = node_version
+        except FileNotFoundError:
+            print("❌ Node.js not installed")
             return False
-        print(f"✓ Node.js {result.stdout.strip()}")
-    except FileNotFoundError:
-        print("❌ Node.js not installed")
-        return False
+    print(f"✓ Node.js {node_version}")
+    
+    # List each directory once instead of stat-ing every file separately
+    backend_files = _dir_entries(Path(__file__).parent / "backend")
+    frontend_files = _dir_entries(Path(__file__).parent / "frontend")
     
     # Check backend dependencies
-    backend_dir = Path(__file__).parent / "backend"
-    if not (backend_dir / "requirements.txt").exists():
+    if "requirements.txt" not in backend_files:
         print("❌ Backend requirements.txt not found")
         return False
     
     # Check frontend dependencies
-    frontend_dir = Path(__file__).parent / "frontend"
-    if not (frontend_dir / "package.json").exists():
+    if "package.json" not in frontend_files:
         print("❌ Frontend package.json not found")
         return False
     
     # Check .env file
-    env_file = backend_dir / ".env"
-    if not env_file.exists():
+    if ".env" not in backend_files:
         print("⚠️  .env file not found in backend directory")
         print("Please copy .env.example to .env and add your API keys")
         return False
@@ -92,10 +118,9 @@ def install_dependencies():
     # Install backend dependencies
     print("Installing Python dependencies...")
     backend_dir = Path(__file__).parent / "backend"
-    os.chdir(backend_dir)
     
     try:
-        subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], check=True)
+        subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], cwd=backend_dir, check=True)
         print("✓ Python dependencies installed")
     except subprocess.CalledProcessError:
         print("❌ Failed to install Python dependencies")
@@ -104,10 +129,9 @@ def install_dependencies():
     # Install frontend dependencies
     print("Installing Node.js dependencies...")
     frontend_dir = Path(__file__).parent / "frontend"
-    os.chdir(frontend_dir)
     
     try:
-        subprocess.run(["npm", "install"], check=True)
+        subprocess.run(["npm", "install"], cwd=frontend_dir, check=True)
         print("✓ Node.js dependencies installed")
     except subprocess.CalledProcessError:
         print("❌ Failed to install Node.js dependencies")
@@ -142,8 +166,9 @@ def main():
     backend_thread = threading.Thread(target=start_backend, daemon=True)
     backend_thread.start()
     
-    # Wait a moment for backend to start
-    time.sleep(3)
+    # Wait for the backend to come up before starting the frontend
+    if not wait_for_backend():
+        print("⚠️  Backend did not respond within 15 seconds, starting frontend anyway")
     
     try:
         # Start frontend (this will block)
@@ -4,10 +4,14 @@ Startup script for the Multimodal QA backend server.
 """
 
 import os
+import re
 import sys
 import subprocess
 from pathlib import Path
 
+# API key assignments in .env, one per line (commented-out lines don't match)
+ENV_KEY_PATTERN = re.compile(r'^(OPENAI_API_KEY|ANTHROPIC_API_KEY)=(.*)$', re.MULTILINE)
+
 def check_python_version():
     """Check if Python version is compatible."""
     if sys.version_info < (3, 8):
@@ -43,8 +47,10 @@ def check_env_file():
     with open(env_file, 'r') as f:
         content = f.read()
         
-    has_openai = "OPENAI_API_KEY=" in content and not content.split("OPENAI_API_KEY=")[1].split('\n')[0].strip() == "your_openai_api_key_here"
-    has_anthropic = "ANTHROPIC_API_KEY=" in content and not content.split("ANTHROPIC_API_KEY=")[1].split('\n')[0].strip() == "your_anthropic_api_key_here"
+    # Read both keys in one scan; a blank or placeholder value doesn't count
+    found = {m.group(1): m.group(2).strip() for m in ENV_KEY_PATTERN.finditer(content)}
+    has_openai = found.get("OPENAI_API_KEY") not in (None, "", "your_openai_api_key_here")
+    has_anthropic = found.get("ANTHROPIC_API_KEY") not in (None, "", "your_anthropic_api_key_here")
     
     if not (has_openai or has_anthropic):
         print("⚠️  No API keys configured in .env file")
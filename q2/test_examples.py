@@ -3,7 +3,9 @@
 Test script for the Multimodal QA API with example image-question pairs.
 """
 
+import asyncio
 import requests
+import httpx
 import json
 import time
 from pathlib import Path
@@ -57,16 +59,19 @@ def test_api_status():
         print("❌ Could not connect to API. Make sure the backend is running on port 8000")
         return False
 
-def test_image_analysis(image_data, test_number):
+async def test_image_analysis(client, image_data, test_number):
     """Test image analysis with a specific image-question pair."""
-    print(f"\n📸 Test {test_number}: {image_data['description']}")
-    print(f"Question: {image_data['question']}")
-    print(f"Image URL: {image_data['url']}")
+    # Buffer the output so concurrent tests don't interleave their lines
+    lines = [
+        f"\n📸 Test {test_number}: {image_data['description']}",
+        f"Question: {image_data['question']}",
+        f"Image URL: {image_data['url']}"
+    ]
     
     start_time = time.time()
     
     try:
-        response = requests.post(
+        response = await client.post(
             f"{BASE_URL}/analyze-url",
             json={
                 "question": image_data["question"],
@@ -79,13 +84,13 @@ def test_image_analysis(image_data, test_number):
             result = response.json()
             processing_time = time.time() - start_time
             
-            print(f"✓ Analysis completed in {processing_time:.2f}s")
-            print(f"Model used: {result['model_used']}")
-            print(f"Processing time (server): {result['processing_time']:.2f}s")
-            print(f"Fallback used: {result['fallback_used']}")
-            print(f"Answer: {result['answer'][:200]}{'...' if len(result['answer']) > 200 else ''}")
+            lines.append(f"✓ Analysis completed in {processing_time:.2f}s")
+            lines.append(f"Model used: {result['model_used']}")
+            lines.append(f"Processing time (server): {result['processing_time']:.2f}s")
+            lines.append(f"Fallback used: {result['fallback_used']}")
+            lines.append(f"Answer: {result['answer'][:200]}{'...' if len(result['answer']) > 200 else ''}")
             
-            return {
+            outcome = {
                 "success": True,
                 "model": result['model_used'],
                 "processing_time": result['processing_time'],
@@ -93,16 +98,27 @@ def test_image_analysis(image_data, test_number):
                 "answer_length": len(result['answer'])
             }
         else:
-            print(f"❌ API error: {response.status_code}")
-            print(f"Error details: {response.text}")
-            return {"success": False, "error": response.text}
+            lines.append(f"❌ API error: {response.status_code}")
+            lines.append(f"Error details: {response.text}")
+            outcome = {"success": False, "error": response.text}
             
-    except requests.exceptions.Timeout:
-        print("❌ Request timed out")
-        return {"success": False, "error": "timeout"}
+    except httpx.TimeoutException:
+        lines.append("❌ Request timed out")
+        outcome = {"success": False, "error": "timeout"}
     except Exception as e:
-        print(f"❌ Error: {e}")
-        return {"success": False, "error": str(e)}
+        lines.append(f"❌ Error: {e}")
+        outcome = {"success": False, "error": str(e)}
+    
+    print("\n".join(lines))
+    return outcome
+
+async def run_image_tests():
+    """Run all image analysis tests concurrently over one client."""
+    async with httpx.AsyncClient() as client:
+        return await asyncio.gather(*[
+            test_image_analysis(client, image_data, i)
+            for i, image_data in enumerate(TEST_IMAGES, 1)
+        ])
 
 def generate_test_report(results):
     """Generate a summary report of test results."""
@@ -160,14 +176,10 @@ def main():
         print("3. Server is accessible on http://localhost:8000")
         return
     
-    # Run image analysis tests
-    results = []
-    for i, image_data in enumerate(TEST_IMAGES, 1):
-        result = test_image_analysis(image_data, i)
-        results.append(result)
-        
-        # Small delay between requests
-        time.sleep(1)
+    # Run image analysis tests concurrently; total time is the slowest request
+    start_time = time.time()
+    results = asyncio.run(run_image_tests())
+    print(f"\n⏱️  All tests finished in {time.time() - start_time:.2f}s")
     
     # Generate report
     generate_test_report(results)
@@ -12,16 +12,34 @@ import os
 import sys
 import json
 import re
-from typing import Dict, Any, Optional, List
+import ast
+import asyncio
+import hashlib
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 import openai
 from dotenv import load_dotenv
 
-# Add tools directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'tools'))
+from tools import MATH_TOOLS, STRING_TOOLS
 
-from math_tools import MATH_TOOLS, call_tool as call_math_tool
-from string_tools import STRING_TOOLS, call_tool as call_string_tool
+# "category.name" -> tool function, built once at import
+AVAILABLE_TOOLS = {
+    **{f"math.{name}": func for name, func in MATH_TOOLS.items()},
+    **{f"string.{name}": func for name, func in STRING_TOOLS.items()}
+}
+
+# On-disk cache of LLM responses, so repeated queries skip the API call.
+# Set LLM_CACHE_PATH to an empty string to disable it.
+DEFAULT_LLM_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "tool_reasoner", "llm_cache.json")
+
+# Marks where the query goes while the static prompt text is built
+QUERY_PLACEHOLDER = "\x00QUERY\x00"
+
+# Section headers the reasoning prompt asks the LLM to use
+_SECTION_HEADER_RE = re.compile(r"(REASONING|TOOL_NEEDED|TOOL_CALL|FINAL_ANSWER):")
+
+# Tool call syntax, e.g. math.average([18, 50])
+_TOOL_CALL_RE = re.compile(r"(\w+\.\w+)\((.*?)\)")
 
 
 @dataclass
@@ -47,17 +65,27 @@ class ToolEnhancedReasoner:
         if not self.api_key:
             raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
         
-        openai.api_key = self.api_key
         self.model = model
         
+        # Clients are built once and reused, so calls share their connections
+        self._client = openai.OpenAI(api_key=self.api_key)
+        self._async_client = openai.AsyncOpenAI(api_key=self.api_key)
+        
+        self.cache_path = os.getenv("LLM_CACHE_PATH", DEFAULT_LLM_CACHE_PATH)
+        self._llm_cache = self._load_llm_cache()
+        
         # Available tools
-        self.available_tools = {
-            **{f"math.{name}": func for name, func in MATH_TOOLS.items()},
-            **{f"string.{name}": func for name, func in STRING_TOOLS.items()}
-        }
+        self.available_tools = AVAILABLE_TOOLS
+        
+        self._prompt_prefix, self._prompt_suffix = self._build_prompt_parts()
     
     def get_reasoning_prompt(self, query: str) -> str:
         """Create a chain-of-thought prompt for the LLM."""
+        # Only the query varies; the rest of the prompt is built once in __init__
+        return self._prompt_prefix + query + self._prompt_suffix
+    
+    def _build_prompt_parts(self) -> Tuple[str, str]:
+        """Build the static prompt text before and after the query."""
         tool_descriptions = self._get_tool_descriptions()
         
         prompt = f"""You are an AI assistant that can reason through problems step by step and use tools when needed.
@@ -67,7 +95,7 @@ Available Tools:
 
 Your task is to analyze the following query and provide a step-by-step reasoning process.
 
-Query: "{query}"
+Query: "{QUERY_PLACEHOLDER}"
 
 Please follow this format:
 
@@ -89,7 +117,8 @@ Remember:
 - Be precise about which tool to use and how to call it
 - Provide clear reasoning for your decisions
 """
-        return prompt
+        prefix, suffix = prompt.split(QUERY_PLACEHOLDER)
+        return prefix, suffix
     
     def _get_tool_descriptions(self) -> str:
         """Get descriptions of available tools."""
@@ -114,21 +143,80 @@ Remember:
         
         return "\n".join(descriptions)
     
+    def _load_llm_cache(self) -> Dict[str, str]:
+        """Load cached LLM responses from disk (empty if disabled or unreadable)."""
+        if not self.cache_path:
+            return {}
+        
+        try:
+            with open(self.cache_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_llm_cache(self):
+        """Atomically write the LLM response cache to disk."""
+        if not self.cache_path:
+            return
+        
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._llm_cache, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # Caching is best-effort
+            pass
+    
+    def _llm_request(self, prompt: str) -> Dict[str, Any]:
+        """Build the chat completion arguments for a prompt."""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": "You are a helpful AI assistant that can reason step by step and use tools when needed."},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": 1000,
+            "temperature": 0.1
+        }
+    
+    def _llm_cache_key(self, prompt: str) -> str:
+        """Key a prompt's cached response by model and prompt."""
+        return hashlib.sha256(f"{self.model}\n{prompt}".encode()).hexdigest()
+    
+    def _store_llm_response(self, cache_key: str, response) -> str:
+        """Extract the response text and add it to the cache."""
+        content = response.choices[0].message.content.strip()
+        self._llm_cache[cache_key] = content
+        self._save_llm_cache()
+        return content
+    
     def call_llm(self, prompt: str) -> str:
-        """Call the LLM with the given prompt."""
+        """Call the LLM with the given prompt (cached by model and prompt)."""
+        cache_key = self._llm_cache_key(prompt)
+        if cache_key in self._llm_cache:
+            return self._llm_cache[cache_key]
+        
+        try:
+            response = self._client.chat.completions.create(**self._llm_request(prompt))
+        except Exception as e:
+            raise Exception(f"Error calling LLM: {e}")
+        
+        return self._store_llm_response(cache_key, response)
+    
+    async def call_llm_async(self, prompt: str) -> str:
+        """Call the LLM without blocking the event loop (same cache as call_llm)."""
+        cache_key = self._llm_cache_key(prompt)
+        if cache_key in self._llm_cache:
+            return self._llm_cache[cache_key]
+        
         try:
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful AI assistant that can reason step by step and use tools when needed."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.1
-            )
-            return response.choices[0].message.content.strip()
+            response = await self._async_client.chat.completions.create(**self._llm_request(prompt))
         except Exception as e:
             raise Exception(f"Error calling LLM: {e}")
+        
+        return self._store_llm_response(cache_key, response)
     
     def parse_llm_response(self, response: str) -> Dict[str, str]:
         """Parse the LLM response to extract reasoning, tool call, and answer."""
@@ -139,24 +227,51 @@ Remember:
             "final_answer": ""
         }
         
-        # Extract sections using regex
-        reasoning_match = re.search(r"REASONING:\s*(.*?)(?=TOOL_NEEDED:|$)", response, re.DOTALL)
-        if reasoning_match:
-            sections["reasoning"] = reasoning_match.group(1).strip()
+        # Find every section header in one scan; each section runs until the
+        # next header (or the end), and the first occurrence of a header wins
+        headers = list(_SECTION_HEADER_RE.finditer(response))
+        seen = set()
+        for i, match in enumerate(headers):
+            key = match.group(1).lower()
+            if key in seen:
+                continue
+            seen.add(key)
+            
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(response)
+            sections[key] = response[match.end():end].strip()
+        
+        return sections
+    
+    def _parse_tool_args(self, tool_name: str, args_str: str) -> List[Any]:
+        """Parse a tool call's argument string into Python values."""
+        if not args_str.strip():
+            return []
         
-        tool_needed_match = re.search(r"TOOL_NEEDED:\s*(.*?)(?=TOOL_CALL:|$)", response, re.DOTALL)
-        if tool_needed_match:
-            sections["tool_needed"] = tool_needed_match.group(1).strip()
+        # Literal arguments (numbers, lists, quoted strings) parse in one go;
+        # the trailing comma makes a single argument a tuple too
+        try:
+            args = list(ast.literal_eval(f"({args_str},)"))
+        except (ValueError, SyntaxError):
+            args = None
         
-        tool_call_match = re.search(r"TOOL_CALL:\s*(.*?)(?=FINAL_ANSWER:|$)", response, re.DOTALL)
-        if tool_call_match:
-            sections["tool_call"] = tool_call_match.group(1).strip()
+        if args is not None:
+            # Tools get the literal values as written, so ints stay ints
+            # (factorial, round_number), quoted strings stay strings
+            # (calculate_expression) and booleans stay booleans. String tools
+            # take text, so an unquoted number like reverse_string(12321) is
+            # passed as "12321"
+            if tool_name.startswith("string."):
+                args = [
+                    str(arg) if isinstance(arg, (int, float)) and not isinstance(arg, bool) else arg
+                    for arg in args
+                ]
+            return args
         
-        final_answer_match = re.search(r"FINAL_ANSWER:\s*(.*?)$", response, re.DOTALL)
-        if final_answer_match:
-            sections["final_answer"] = final_answer_match.group(1).strip()
+        if tool_name.startswith("math."):
+            raise ValueError(f"Invalid arguments for {tool_name}: {args_str}")
         
-        return sections
+        # LLMs often leave string arguments unquoted, e.g. count_vowels(hello)
+        return [arg.strip().strip('"\'') for arg in args_str.split(",")]
     
     def execute_tool_call(self, tool_call: str) -> Any:
         """Execute a tool call and return the result."""
@@ -165,42 +280,24 @@ Remember:
         
         # Parse tool call (simple parsing for demonstration)
         # Format: tool_name(arguments)
-        match = re.match(r"(\w+\.\w+)\((.*?)\)", tool_call)
+        match = _TOOL_CALL_RE.match(tool_call)
         if not match:
             raise ValueError(f"Invalid tool call format: {tool_call}")
         
         tool_name = match.group(1)
         args_str = match.group(2)
         
-        if tool_name not in self.available_tools:
+        tool = self.available_tools.get(tool_name)
+        if tool is None:
             raise ValueError(f"Unknown tool: {tool_name}")
         
-        # Parse arguments (simple parsing)
-        args = []
-        if args_str.strip():
-            # Handle different argument types
-            if tool_name.startswith("math."):
-                # For math tools, parse numbers and lists
-                if "[" in args_str and "]" in args_str:
-                    # List of numbers
-                    list_match = re.search(r"\[(.*?)\]", args_str)
-                    if list_match:
-                        numbers_str = list_match.group(1)
-                        args = [[float(x.strip()) for x in numbers_str.split(",")]]
-                else:
-                    # Individual numbers
-                    args = [float(x.strip()) for x in args_str.split(",")]
-            else:
-                # For string tools, treat as strings
-                args = [arg.strip().strip('"\'') for arg in args_str.split(",")]
+        args = self._parse_tool_args(tool_name, args_str)
         
-        # Call the appropriate tool
-        if tool_name.startswith("math."):
-            return call_math_tool(tool_name.split(".", 1)[1], *args)
-        elif tool_name.startswith("string."):
-            return call_string_tool(tool_name.split(".", 1)[1], *args)
-        else:
-            raise ValueError(f"Unknown tool category: {tool_name}")
+        # Dispatch straight to the tool function
+        try:
+            return tool(*args)
+        except Exception as e:
+            raise ValueError(f"Error calling {tool_name.split('.', 1)[1]}: {e}")
     
     def reason(self, query: str) -> ReasoningResult:
         """Main reasoning function that processes a query."""
@@ -208,45 +305,64 @@ Remember:
             # Get reasoning from LLM
             prompt = self.get_reasoning_prompt(query)
             llm_response = self.call_llm(prompt)
+            return self._build_result(query, llm_response)
+        except Exception as e:
+            return self._error_result(query, e)
+    
+    async def reason_async(self, query: str) -> ReasoningResult:
+        """Process a query without blocking the event loop."""
+        try:
+            prompt = self.get_reasoning_prompt(query)
+            llm_response = await self.call_llm_async(prompt)
+            return self._build_result(query, llm_response)
+        except Exception as e:
+            return self._error_result(query, e)
+    
+    async def reason_many(self, queries: List[str]) -> List[ReasoningResult]:
+        """Process several queries concurrently, returning results in order."""
+        return list(await asyncio.gather(*(self.reason_async(query) for query in queries)))
+    
+    def _build_result(self, query: str, llm_response: str) -> ReasoningResult:
+        """Parse an LLM response, run its tool call, and build the result."""
+        # Parse the response
+        parsed = self.parse_llm_response(llm_response)
+        
+        # Execute tool if needed
+        tool_result = None
+        tool_used = None
+        
+        if parsed["tool_needed"].upper() != "NONE" and parsed["tool_call"]:
+            tool_used = parsed["tool_call"]
+            tool_result = self.execute_tool_call(parsed["tool_call"])
             
-            # Parse the response
-            parsed = self.parse_llm_response(llm_response)
-            
-            # Execute tool if needed
-            tool_result = None
-            tool_used = None
-            
-            if parsed["tool_needed"].upper() != "NONE" and parsed["tool_call"]:
-                tool_used = parsed["tool_call"]
-                tool_result = self.execute_tool_call(parsed["tool_call"])
-                
-                # Update final answer with tool result if needed
-                if tool_result is not None:
-                    final_answer = f"{parsed['final_answer']} (Tool result: {tool_result})"
-                else:
-                    final_answer = parsed["final_answer"]
+            # Update final answer with tool result if needed
+            if tool_result is not None:
+                final_answer = f"{parsed['final_answer']} (Tool result: {tool_result})"
             else:
                 final_answer = parsed["final_answer"]
-            
-            return ReasoningResult(
-                query=query,
-                reasoning_steps=parsed["reasoning"],
-                tool_used=tool_used,
-                tool_result=tool_result,
-                final_answer=final_answer,
-                success=True
-            )
-            
-        except Exception as e:
-            return ReasoningResult(
-                query=query,
-                reasoning_steps="",
-                tool_used=None,
-                tool_result=None,
-                final_answer="",
-                success=False,
-                error=str(e)
-            )
+        else:
+            final_answer = parsed["final_answer"]
+        
+        return ReasoningResult(
+            query=query,
+            reasoning_steps=parsed["reasoning"],
+            tool_used=tool_used,
+            tool_result=tool_result,
+            final_answer=final_answer,
+            success=True
+        )
+    
+    def _error_result(self, query: str, error: Exception) -> ReasoningResult:
+        """Build the result for a query that failed."""
+        return ReasoningResult(
+            query=query,
+            reasoning_steps="",
+            tool_used=None,
+            tool_result=None,
+            final_answer="",
+            success=False,
+            error=str(error)
+        )
 
 
 def main():
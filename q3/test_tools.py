@@ -6,6 +6,7 @@ Tests the tools without requiring an API key.
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Add tools directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'tools'))
@@ -14,6 +15,24 @@ from tools.math_tools import call_tool as call_math_tool
 from tools.string_tools import call_tool as call_string_tool
 
 
+def _run_case(case):
+    """Run a single (call_tool, tool_name, args, description) case."""
+    call_tool, tool_name, args, description = case
+    try:
+        result = call_tool(tool_name, *args)
+        return f"✓ {description}: {result}"
+    except Exception as e:
+        return f"✗ {description}: Error - {e}"
+
+
+def run_cases(call_tool, tests):
+    """Run independent tool cases concurrently, printing results in order."""
+    cases = [(call_tool, tool_name, args, description) for tool_name, args, description in tests]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for line in executor.map(_run_case, cases):
+            print(line)
+
+
 def test_math_tools():
     """Test mathematical tools."""
     print("=" * 50)
@@ -28,12 +47,7 @@ def test_math_tools():
         ("power", [2, 3], "2^3"),
     ]
     
-    for tool_name, args, description in tests:
-        try:
-            result = call_math_tool(tool_name, *args)
-            print(f"✓ {description}: {result}")
-        except Exception as e:
-            print(f"✗ {description}: Error - {e}")
+    run_cases(call_math_tool, tests)
 
 
 def test_string_tools():
@@ -50,12 +64,33 @@ def test_string_tools():
         ("find_longest_word", ["The quick brown fox"], "Longest word in 'The quick brown fox'"),
     ]
     
-    for tool_name, args, description in tests:
+    run_cases(call_string_tool, tests)
+
+
+def test_tool_calls():
+    """Test parsing and dispatching of LLM-style tool calls."""
+    print("\n" + "=" * 50)
+    print("TESTING TOOL CALLS")
+    print("=" * 50)
+    
+    tool_calls = [
+        "string.count_digits(12345)",
+        "string.reverse_string(12321)",
+        "string.is_palindrome(12321)",
+    ]
+    
+    try:
+        from main import ToolEnhancedReasoner
+        reasoner = ToolEnhancedReasoner(api_key="test")
+    except Exception as e:
+        print(f"✗ Could not create reasoner: {e}")
+        return
+    
+    for tool_call in tool_calls:
         try:
-            result = call_string_tool(tool_name, *args)
-            print(f"✓ {description}: {result}")
+            print(f"✓ {tool_call}: {reasoner.execute_tool_call(tool_call)}")
         except Exception as e:
-            print(f"✗ {description}: Error - {e}")
+            print(f"✗ {tool_call}: Error - {e}")
 
 
 def test_example_queries():
@@ -100,6 +135,7 @@ def main():
     
     test_math_tools()
     test_string_tools()
+    test_tool_calls()
     test_example_queries()
     
     print("\n" + "=" * 60)
@@ -3,9 +3,51 @@ Math tools for the tool-enhanced reasoning script.
 Provides mathematical operations that can be called by the LLM.
 """
 
+import ast
 import math
+import sys
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Union, List
 
+# Lists at least this long take the numpy median path when numpy is installed.
+# numpy only breaks even with sorted() at roughly 600 floats, so the cutoff
+# sits higher, where numpy is already 1.6-2x faster, to leave a safe margin
+NUMPY_MEDIAN_MIN_SIZE = 1000
+
+
+# Characters allowed in calculate_expression, and the syntax they may form
+_EXPRESSION_CHARS = frozenset("0123456789+-*/().sqrt")
+_EXPRESSION_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Pow, ast.UAdd, ast.USub
+)
+_EXPRESSION_NAMES = {"sqrt": math.sqrt}
+
+# Factorials up to this n are cached; larger ones are multi-kilobyte ints.
+# typed=True keeps factorial(5.0) from being answered by a cached factorial(5)
+FACTORIAL_CACHE_MAX_N = 1000
+_cached_factorial = lru_cache(maxsize=256, typed=True)(math.factorial)
+
+
+@lru_cache(maxsize=1)
+def _get_numpy():
+    """Import numpy on first use (None if unavailable)."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _as_ndarray(numbers):
+    """Return numbers if it is a numpy array, else None."""
+    # A caller can only pass an array if it already imported numpy itself
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(numbers, np.ndarray):
+        return numbers
+    return None
+
 
 def add(a: float, b: float) -> float:
     """Add two numbers."""
@@ -43,17 +85,33 @@ def square_root(number: float) -> float:
 
 def average(numbers: List[float]) -> float:
     """Calculate the average of a list of numbers."""
-    if not numbers:
+    if len(numbers) == 0:
         raise ValueError("Cannot calculate average of empty list")
+    
+    # Arrays reduce in numpy's typed C loop rather than element by element
+    array = _as_ndarray(numbers)
+    if array is not None:
+        return float(array.mean())
     return sum(numbers) / len(numbers)
 
 
 def median(numbers: List[float]) -> float:
     """Calculate the median of a list of numbers."""
-    if not numbers:
+    if len(numbers) == 0:
         raise ValueError("Cannot calculate median of empty list")
+    n = len(numbers)
+    
+    # np.partition only places the middle element(s) in O(n) instead of sorting
+    use_numpy = n >= NUMPY_MEDIAN_MIN_SIZE or _as_ndarray(numbers) is not None
+    np = _get_numpy() if use_numpy else None
+    if np is not None:
+        mid = n // 2
+        if n % 2 == 0:
+            lower, upper = np.partition(np.asarray(numbers), (mid - 1, mid))[mid - 1:mid + 1].tolist()
+            return (lower + upper) / 2
+        return np.partition(np.asarray(numbers), mid)[mid:mid + 1].tolist()[0]
+    
     sorted_numbers = sorted(numbers)
-    n = len(sorted_numbers)
     if n % 2 == 0:
         return (sorted_numbers[n//2 - 1] + sorted_numbers[n//2]) / 2
     else:
@@ -62,15 +120,23 @@ def median(numbers: List[float]) -> float:
 
 def maximum(numbers: List[float]) -> float:
     """Find the maximum value in a list of numbers."""
-    if not numbers:
+    if len(numbers) == 0:
         raise ValueError("Cannot find maximum of empty list")
+    
+    array = _as_ndarray(numbers)
+    if array is not None:
+        return array.max().item()
     return max(numbers)
 
 
 def minimum(numbers: List[float]) -> float:
     """Find the minimum value in a list of numbers."""
-    if not numbers:
+    if len(numbers) == 0:
         raise ValueError("Cannot find minimum of empty list")
+    
+    array = _as_ndarray(numbers)
+    if array is not None:
+        return array.min().item()
     return min(numbers)
 
 
@@ -78,6 +144,8 @@ def factorial(n: int) -> int:
     """Calculate the factorial of a non-negative integer."""
     if n < 0:
         raise ValueError("Factorial is not defined for negative numbers")
+    if n <= FACTORIAL_CACHE_MAX_N:
+        return _cached_factorial(n)
     return math.factorial(n)
 
 
@@ -107,24 +175,37 @@ def calculate_expression(expression: str) -> float:
     expression = expression.replace(" ", "")
     
     # Only allow safe characters
-    allowed_chars = set("0123456789+-*/().sqrt")
-    if not all(c in allowed_chars for c in expression.lower()):
+    if not _EXPRESSION_CHARS.issuperset(expression.lower()):
         raise ValueError("Expression contains invalid characters")
     
-    # Replace sqrt with math.sqrt
-    expression = expression.replace("sqrt", "math.sqrt")
-    
-    # Evaluate safely (in a real application, you'd want more robust parsing)
+    return _evaluate_expression(expression)
+
+
+@lru_cache(maxsize=512)
+def _evaluate_expression(expression: str) -> float:
+    """Parse, check and evaluate an expression, caching the result per expression."""
     try:
-        # This is a simplified approach - in production, use a proper expression parser
-        result = eval(expression, {"__builtins__": {}, "math": math})
+        # Walk the parsed tree instead of trusting eval() with raw text: only
+        # arithmetic on numeric literals and sqrt() calls are allowed through
+        tree = ast.parse(expression, mode="eval")
+        for node in ast.walk(tree):
+            if not isinstance(node, _EXPRESSION_NODES):
+                raise ValueError(f"unsupported syntax {type(node).__name__}")
+            if isinstance(node, ast.Constant) and type(node.value) not in (int, float):
+                raise ValueError(f"unsupported value {node.value!r}")
+            if isinstance(node, ast.Name) and node.id not in _EXPRESSION_NAMES:
+                raise ValueError(f"unknown name {node.id!r}")
+            if isinstance(node, ast.Call) and (node.keywords or len(node.args) != 1):
+                raise ValueError("sqrt takes exactly one argument")
+        
+        result = eval(compile(tree, "<expression>", "eval"), {"__builtins__": {}}, _EXPRESSION_NAMES)
         return float(result)
     except Exception as e:
         raise ValueError(f"Invalid mathematical expression: {e}")
 
 
-# Tool registry for easy access
-MATH_TOOLS = {
+# Tool registry for easy access, read-only so shared use can't alter it
+MATH_TOOLS = MappingProxyType({
     "add": add,
     "subtract": subtract,
     "multiply": multiply,
@@ -140,7 +221,7 @@ MATH_TOOLS = {
     "round_number": round_number,
     "percentage": percentage,
     "calculate_expression": calculate_expression
-}
+})
 
 
 def get_available_tools() -> List[str]:
@@ -150,10 +231,13 @@ def get_available_tools() -> List[str]:
 
 def call_tool(tool_name: str, *args, **kwargs) -> Union[float, int]:
     """Call a math tool by name with given arguments."""
-    if tool_name not in MATH_TOOLS:
+    # One lookup resolves and validates the name
+    tool = MATH_TOOLS.get(tool_name)
+    if tool is None:
         raise ValueError(f"Unknown math tool: {tool_name}")
     
+    # Forwarding an empty **kwargs still takes CPython's slower keyword call path
     try:
-        return MATH_TOOLS[tool_name](*args, **kwargs)
+        return tool(*args, **kwargs) if kwargs else tool(*args)
     except Exception as e:
         raise ValueError(f"Error calling {tool_name}: {e}")
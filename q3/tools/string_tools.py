@@ -4,30 +4,72 @@ Provides string analysis operations that can be called by the LLM.
 """
 
 import re
-from typing import List, Dict, Union
+import string
+from collections import Counter
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, List, Dict, Tuple, Union
+
+
+def _other_bytes(chars: str) -> bytes:
+    """Every byte value except those of chars, as a bytes.translate deletion set."""
+    keep = chars.encode('ascii')
+    return bytes(i for i in range(256) if i not in keep)
+
+
+# Deletion sets for counting characters in one C call: deleting every other
+# byte leaves just the matches, so count = len(data.translate(None, others)).
+# On ASCII text the classes match the str.is*() methods exactly
+_NOT_VOWELS = _other_bytes('aeiouAEIOU')
+_NOT_VOWELS_Y = _other_bytes('aeiouAEIOUyY')
+_NOT_LETTERS = _other_bytes(string.ascii_letters)
+_NOT_UPPERCASE = _other_bytes(string.ascii_uppercase)
+_NOT_LOWERCASE = _other_bytes(string.ascii_lowercase)
+_NOT_DIGITS = _other_bytes(string.digits)
+
+# Punctuation stripped from the ends of words before measuring them
+_WORD_PUNCTUATION = '.,!?;:"()[]{}'
+_WORD_PUNCTUATION_BYTES = _WORD_PUNCTUATION.encode('ascii')
+
+# str.split() also breaks on the ASCII separator controls, bytes.split() doesn't
+_SEPARATORS_TO_SPACE = bytes.maketrans(b'\x1c\x1d\x1e\x1f', b'    ')
+
+# Sentence-ending punctuation, and integers or decimals with an optional sign
+_SENTENCE_END_RE = re.compile(r'[.!?]+')
+_NUMBER_RE = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+def _count_bytes(data: bytes, others: bytes) -> int:
+    """Count the bytes of data that are not in the deletion set others."""
+    return len(data.translate(None, others))
+
+
+def _count_class(text: str, others: bytes, is_member: Callable[[str], bool]) -> int:
+    """Count the characters of a text in a class, given its ASCII deletion set."""
+    if text.isascii():
+        return _count_bytes(text.encode('ascii'), others)
+    # Non-ASCII classes follow Unicode rules; measured faster per character than
+    # splitting out the ASCII part or counting a Counter histogram
+    return sum(1 for char in text if is_member(char))
 
 
 def count_vowels(text: str, include_y: bool = False) -> int:
     """Count the number of vowels in a text."""
-    vowels = "aeiouAEIOU"
-    if include_y:
-        vowels += "yY"
-    
-    return sum(1 for char in text if char in vowels)
+    # Vowels are ASCII and UTF-8 never uses ASCII bytes inside multi-byte
+    # characters, so counting encoded bytes is exact for any text
+    data = text.encode('utf-8', 'surrogatepass')
+    return _count_bytes(data, _NOT_VOWELS_Y if include_y else _NOT_VOWELS)
 
 
 def count_consonants(text: str, include_y: bool = True) -> int:
     """Count the number of consonants in a text."""
-    vowels = "aeiouAEIOU"
-    if not include_y:
-        vowels += "yY"
-    
-    return sum(1 for char in text if char.isalpha() and char not in vowels)
+    # Every vowel is a letter, so consonants are the letters left over
+    return count_letters(text) - count_vowels(text, include_y=not include_y)
 
 
 def count_letters(text: str) -> int:
     """Count the number of letters (alphabetic characters) in a text."""
-    return sum(1 for char in text if char.isalpha())
+    return _count_class(text, _NOT_LETTERS, str.isalpha)
 
 
 def count_words(text: str) -> int:
@@ -37,9 +79,12 @@ def count_words(text: str) -> int:
 
 def count_sentences(text: str) -> int:
     """Count the number of sentences in a text."""
+    # Substring checks run in C and skip the regex for unpunctuated text
+    if '.' not in text and '!' not in text and '?' not in text:
+        return 0
+    
     # Simple sentence counting based on sentence-ending punctuation
-    sentence_endings = re.findall(r'[.!?]+', text)
-    return len(sentence_endings)
+    return len(_SENTENCE_END_RE.findall(text))
 
 
 def count_characters(text: str, include_spaces: bool = True) -> int:
@@ -57,23 +102,29 @@ def count_specific_character(text: str, character: str) -> int:
 
 def count_uppercase_letters(text: str) -> int:
     """Count the number of uppercase letters in a text."""
-    return sum(1 for char in text if char.isupper())
+    return _count_class(text, _NOT_UPPERCASE, str.isupper)
 
 
 def count_lowercase_letters(text: str) -> int:
     """Count the number of lowercase letters in a text."""
-    return sum(1 for char in text if char.islower())
+    return _count_class(text, _NOT_LOWERCASE, str.islower)
 
 
 def count_digits(text: str) -> int:
     """Count the number of digits in a text."""
-    return sum(1 for char in text if char.isdigit())
+    return _count_class(text, _NOT_DIGITS, str.isdigit)
+
+
+# Cached so word tools called on the same passage share one split
+@lru_cache(maxsize=64)
+def _clean_words(text: str) -> Tuple[str, ...]:
+    """Split a text into words with surrounding punctuation removed."""
+    return tuple(word.strip(_WORD_PUNCTUATION) for word in text.split())
 
 
 def get_word_lengths(text: str) -> List[int]:
     """Get the length of each word in a text."""
-    words = text.split()
-    return [len(word.strip('.,!?;:"()[]{}')) for word in words]
+    return [len(word) for word in _clean_words(text)]
 
 
 def get_average_word_length(text: str) -> float:
@@ -86,24 +137,19 @@ def get_average_word_length(text: str) -> float:
 
 def find_longest_word(text: str) -> str:
     """Find the longest word in a text."""
-    words = text.split()
-    if not words:
+    # Remove punctuation for length comparison
+    clean_words = _clean_words(text)
+    if not clean_words:
         return ""
     
-    # Remove punctuation for length comparison
-    clean_words = [word.strip('.,!?;:"()[]{}') for word in words]
     longest = max(clean_words, key=len)
     return longest
 
 
 def find_shortest_word(text: str) -> str:
     """Find the shortest word in a text."""
-    words = text.split()
-    if not words:
-        return ""
-    
-    # Remove punctuation for length comparison
-    clean_words = [word.strip('.,!?;:"()[]{}') for word in words if word.strip('.,!?;:"()[]{}')]
+    # Remove punctuation for length comparison, dropping words that were all punctuation
+    clean_words = [word for word in _clean_words(text) if word]
     if not clean_words:
         return ""
     
@@ -113,23 +159,64 @@ def find_shortest_word(text: str) -> str:
 
 def count_unique_words(text: str, case_sensitive: bool = False) -> int:
     """Count the number of unique words in a text."""
-    words = text.split()
-    clean_words = [word.strip('.,!?;:"()[]{}') for word in words]
+    # ASCII words are compared as bytes, which split, lowercase and hash faster
+    if text.isascii():
+        data = text.encode('ascii').translate(_SEPARATORS_TO_SPACE)
+        if not case_sensitive:
+            data = data.lower()
+        return len({word.strip(_WORD_PUNCTUATION_BYTES) for word in data.split()})
     
+    # Lowercasing doesn't touch whitespace or punctuation, so do it once up front
     if not case_sensitive:
-        clean_words = [word.lower() for word in clean_words]
+        text = text.lower()
     
-    return len(set(clean_words))
+    return len(set(_clean_words(text)))
 
 
 def get_character_frequency(text: str) -> Dict[str, int]:
     """Get the frequency of each character in a text."""
-    frequency = {}
-    for char in text:
-        frequency[char] = frequency.get(char, 0) + 1
-    return frequency
-
-
+    # Counter tallies in C; shares analyze_text's cached histogram
+    return dict(_text_histogram(text))
+
+
+@lru_cache(maxsize=128)
+def _text_histogram(text: str) -> Counter:
+    """Count each character of a text, cached so repeated texts share it."""
+    return Counter(text)
+
+
+def analyze_text(text: str) -> Dict[str, Union[int, Dict[str, int]]]:
+    """Compute the counting metrics of a text from a single character histogram."""
+    # One C-level pass over the text; every class count is then a pass over
+    # the distinct characters only, instead of one full scan per metric
+    histogram = _text_histogram(text)
+    letters = uppercase = lowercase = digits = vowels = 0
+    for char, count in histogram.items():
+        if char.isalpha():
+            letters += count
+            if char in 'aeiouAEIOU':
+                vowels += count
+        if char.isupper():
+            uppercase += count
+        elif char.islower():
+            lowercase += count
+        if char.isdigit():
+            digits += count
+    
+    return {
+        "words": count_words(text),
+        "letters": letters,
+        "vowels": vowels,
+        "consonants": letters - vowels,
+        "digits": digits,
+        "uppercase_letters": uppercase,
+        "lowercase_letters": lowercase,
+        "character_frequency": dict(histogram)
+    }
+
+
+# The reasoning loop often re-asks about the same text, so these keep recent results
+@lru_cache(maxsize=1024)
 def is_palindrome(text: str, ignore_case: bool = True, ignore_spaces: bool = True) -> bool:
     """Check if a text is a palindrome."""
     processed_text = text
@@ -140,9 +227,17 @@ def is_palindrome(text: str, ignore_case: bool = True, ignore_spaces: bool = Tru
     if ignore_case:
         processed_text = processed_text.lower()
     
-    return processed_text == processed_text[::-1]
+    # Most non-palindromes already differ at the ends; check before copying
+    if processed_text[:1] != processed_text[-1:]:
+        return False
+    
+    # Compare the first half with the reversed second half, so only half the
+    # text is copied and compared
+    half = len(processed_text) // 2
+    return processed_text[:half] == processed_text[:-half - 1:-1]
 
 
+@lru_cache(maxsize=1024)
 def reverse_string(text: str) -> str:
     """Reverse a string."""
     return text[::-1]
@@ -150,6 +245,14 @@ def reverse_string(text: str) -> str:
 
 def count_substring(text: str, substring: str, case_sensitive: bool = True) -> int:
     """Count occurrences of a substring in a text."""
+    # An ASCII character only matches its own two cases in ASCII text, so
+    # count both directly instead of lowercasing a copy of the whole text
+    if not case_sensitive and len(substring) == 1 and substring.isascii() and text.isascii():
+        lower, upper = substring.lower(), substring.upper()
+        if lower == upper:
+            return text.count(substring)
+        return text.count(lower) + text.count(upper)
+    
     if not case_sensitive:
         text = text.lower()
         substring = substring.lower()
@@ -159,25 +262,11 @@ def count_substring(text: str, substring: str, case_sensitive: bool = True) -> i
 
 def extract_numbers(text: str) -> List[float]:
     """Extract all numbers from a text."""
-    # Find all numbers (including decimals)
-    number_pattern = r'-?\d+\.?\d*'
-    matches = re.findall(number_pattern, text)
-    
-    numbers = []
-    for match in matches:
-        try:
-            if '.' in match:
-                numbers.append(float(match))
-            else:
-                numbers.append(float(match))
-        except ValueError:
-            continue
-    
-    return numbers
+    return [float(match) for match in _NUMBER_RE.findall(text)]
 
 
-# Tool registry for easy access
-STRING_TOOLS = {
+# Tool registry for easy access, read-only so shared use can't alter it
+STRING_TOOLS = MappingProxyType({
     "count_vowels": count_vowels,
     "count_consonants": count_consonants,
     "count_letters": count_letters,
@@ -194,11 +283,12 @@ STRING_TOOLS = {
     "find_shortest_word": find_shortest_word,
     "count_unique_words": count_unique_words,
     "get_character_frequency": get_character_frequency,
+    "analyze_text": analyze_text,
     "is_palindrome": is_palindrome,
     "reverse_string": reverse_string,
     "count_substring": count_substring,
     "extract_numbers": extract_numbers
-}
+})
 
 
 def get_available_tools() -> List[str]:
@@ -208,10 +298,13 @@ def get_available_tools() -> List[str]:
 
 def call_tool(tool_name: str, *args, **kwargs) -> Union[int, float, str, List, Dict, bool]:
     """Call a string tool by name with given arguments."""
-    if tool_name not in STRING_TOOLS:
+    # One lookup resolves and validates the name
+    tool = STRING_TOOLS.get(tool_name)
+    if tool is None:
         raise ValueError(f"Unknown string tool: {tool_name}")
     
+    # Forwarding an empty **kwargs still takes CPython's slower keyword call path
     try:
-        return STRING_TOOLS[tool_name](*args, **kwargs)
+        return tool(*args, **kwargs) if kwargs else tool(*args)
     except Exception as e:
         raise ValueError(f"Error calling {tool_name}: {e}")